@@ -4,156 +4,51 @@ Supports table definition via decorators, CRUD operations, and flexible querying
 """
 
 from typing import Any, Dict, List, Optional, Callable, Type, get_type_hints
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field, fields
-from copy import deepcopy
 import inspect
 
+from table_core import Col, Field, Table, WhereClause
 
-class Field:
-    """Represents a field in a table with type and constraints."""
-    def __init__(self, field_type: Type, primary_key: bool = False, nullable: bool = True, unique: bool = False):
-        self.field_type = field_type
-        self.primary_key = primary_key
-        self.nullable = nullable
-        self.unique = unique
-    
-    def validate(self, value: Any) -> bool:
-        """Validate a value against field constraints."""
-        if value is None:
-            return self.nullable
-        
-        # Type checking
-        if not isinstance(value, self.field_type):
-            try:
-                # Try to coerce the type
-                self.field_type(value)
-            except (ValueError, TypeError):
-                return False
-        
-        return True
 
-
-class Table:
-    """Represents a table in the database with schema and data."""
-    def __init__(self, name: str, schema: Dict[str, Field]):
-        self.name = name
-        self.schema = schema
-        self.data: List[Dict[str, Any]] = []
-        self.primary_key_field = next((name for name, field in schema.items() if field.primary_key), None)
-        self._next_id = 1
-    
-    def _validate_record(self, record: Dict[str, Any]) -> tuple[bool, Optional[str]]:
-        """Validate a record against the table schema."""
-        # Check all schema fields are present
-        for field_name, field_def in self.schema.items():
-            if field_name not in record:
-                if not field_def.nullable and field_name != self.primary_key_field:
-                    return False, f"Missing required field: {field_name}"
-                record[field_name] = None
-        
-        # Validate each field
-        for field_name, value in record.items():
-            if field_name not in self.schema:
-                return False, f"Unknown field: {field_name}"
-            
-            field_def = self.schema[field_name]
-            if not field_def.validate(value):
-                return False, f"Invalid value for field {field_name}: {value}"
-            
-            # Check unique constraint
-            if field_def.unique and value is not None:
-                for existing in self.data:
-                    if existing.get(field_name) == value:
-                        return False, f"Duplicate value for unique field {field_name}: {value}"
-        
-        return True, None
-    
-    def insert(self, record: Dict[str, Any]) -> Dict[str, Any]:
-        """Insert a record into the table."""
-        record = deepcopy(record)
-        
-        # Auto-generate primary key if needed
-        if self.primary_key_field and self.primary_key_field not in record:
-            record[self.primary_key_field] = self._next_id
-            self._next_id += 1
-        
-        # Validate record
-        valid, error = self._validate_record(record)
-        if not valid:
-            raise ValueError(f"Invalid record: {error}")
-        
-        self.data.append(record)
-        return record
-    
-    def select(self, where: Optional[Callable[[Dict[str, Any]], bool]] = None, 
-               order_by: Optional[str] = None,
-               limit: Optional[int] = None) -> List[Dict[str, Any]]:
-        """Query records from the table."""
-        results = self.data if where is None else [r for r in self.data if where(r)]
-        
-        if order_by:
-            reverse = False
-            if order_by.startswith('-'):
-                reverse = True
-                order_by = order_by[1:]
-            results = sorted(results, key=lambda x: x.get(order_by, ''), reverse=reverse)
-        
-        if limit is not None:
-            results = results[:limit]
-        
-        return deepcopy(results)
-    
-    def update(self, where: Callable[[Dict[str, Any]], bool], 
-               updates: Dict[str, Any]) -> int:
-        """Update records matching the where clause."""
-        count = 0
-        for record in self.data:
-            if where(record):
-                # Validate updates
-                test_record = {**record, **updates}
-                # Temporarily remove from data for unique checks
-                self.data.remove(record)
-                valid, error = self._validate_record(test_record)
-                self.data.append(record)  # Add back
-                
-                if not valid:
-                    raise ValueError(f"Invalid update: {error}")
-                
-                record.update(updates)
-                count += 1
-        
-        return count
-    
-    def delete(self, where: Callable[[Dict[str, Any]], bool]) -> int:
-        """Delete records matching the where clause."""
-        to_delete = [r for r in self.data if where(r)]
-        for record in to_delete:
-            self.data.remove(record)
-        return len(to_delete)
-    
-    def count(self) -> int:
-        """Return the number of records in the table."""
-        return len(self.data)
+# Field type names as stored in schema files
+_TYPE_MAP = {
+    "int": int,
+    "str": str,
+    "float": float,
+    "bool": bool
+}
 
 
 class Database:
     """Main database class managing multiple tables."""
-    def __init__(self, name: str = "default", persist: bool = False, base_path: str = "./data"):
+    def __init__(self, name: str = "default", persist: bool = False, base_path: str = "./data",
+                 durability: str = "batch", record_format: str = "json", layout: str = "row",
+                 wal_timestamp: str = "ns"):
         self.name = name
         self.tables: Dict[str, Table] = {}
+        # Classes bound to a table by the @table decorator, keyed by table name
+        self._bound_classes: Dict[str, type] = {}
         self.persist = persist
         self.storage = None
+        self._io_pool: Optional[ThreadPoolExecutor] = None
         
         if persist:
-            from persistence import StorageEngine
-            self.storage = StorageEngine(name, base_path)
+            if layout == "columnar":
+                from persistence import ColumnarStorageEngine
+                self.storage = ColumnarStorageEngine(name, base_path, durability, wal_timestamp)
+            elif layout == "row":
+                from persistence import StorageEngine
+                self.storage = StorageEngine(name, base_path, durability, record_format, wal_timestamp)
+            else:
+                raise ValueError(f"Unknown storage layout: {layout}")
     
-    def create_table(self, name: str, schema: Dict[str, Field]) -> Table:
+    def create_table(self, name: str, schema: Dict[str, Field], defensive_copy: bool = True) -> Table:
         """Create a new table in the database."""
         if name in self.tables:
             raise ValueError(f"Table {name} already exists")
         
-        table = Table(name, schema)
+        table = Table(name, schema, defensive_copy=defensive_copy)
         self.tables[name] = table
         
         # Save schema to disk if persistence is enabled
@@ -168,11 +63,20 @@ class Database:
             raise ValueError(f"Table {name} does not exist")
         return self.tables[name]
     
+    def _bind_class(self, name: str, cls: type) -> None:
+        """Cache the named table on a decorated class for direct access."""
+        self._bound_classes[name] = cls
+        cls._table = self.tables.get(name)  # type: ignore[attr-defined]
+    
     def drop_table(self, name: str) -> None:
         """Drop a table from the database."""
         if name in self.tables:
             del self.tables[name]
             
+            # Don't leave decorated classes pointing at the dropped table
+            if name in self._bound_classes:
+                self._bound_classes[name]._table = None  # type: ignore[attr-defined]
+            
             # Remove from disk if persistence is enabled
             if self.persist and self.storage:
                 self.storage.drop_table(name)
@@ -186,8 +90,24 @@ class Database:
         if not self.persist or not self.storage:
             raise RuntimeError("Database was not initialized with persistence enabled")
         
-        for table_name, table in self.tables.items():
-            self.storage.save_records(table_name, table.data)
+        # Queued UPDATE/DELETE entries reach the log (and, unless durability
+        # is 'none', the disk) before the data files they describe
+        self.storage.sync()
+        
+        # Write tables concurrently so save() takes about as long as the
+        # slowest table rather than the sum of all of them; file writes
+        # release the GIL. The pool lives until close().
+        if self._io_pool is None:
+            self._io_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix=f"{self.name}-io")
+        futures = [
+            self._io_pool.submit(self.storage.save_records, table_name, table.data)
+            for table_name, table in self.tables.items()
+        ]
+        for future in futures:
+            future.result()  # Wait, re-raising any write error
+        
+        # Every logged change is now in the data files, so a large WAL can go
+        self.storage.checkpoint_if_large()
         
         return len(self.tables)
     
@@ -197,39 +117,38 @@ class Database:
             raise RuntimeError("Database was not initialized with persistence enabled")
         
         # Discover tables from schema files
-        table_names = self.storage.list_tables()
-        
-        for table_name in table_names:
-            # Load schema
+        schemas = {}
+        for table_name in self.storage.list_tables():
             schema_data = self.storage.load_schema(table_name)
-            if not schema_data:
-                continue
-            
+            if schema_data:
+                schemas[table_name] = schema_data
+        
+        # Read every table's records in parallel
+        all_records = self.storage.load_all(list(schemas))
+        
+        for table_name, schema_data in schemas.items():
             # Reconstruct schema
             schema = {}
             for field_name, field_info in schema_data["schema"].items():
                 # Convert type name back to type
-                type_map = {
-                    "int": int,
-                    "str": str,
-                    "float": float,
-                    "bool": bool
-                }
-                field_type = type_map.get(field_info["type"], str)
-                
                 schema[field_name] = Field(
-                    field_type=field_type,
+                    field_type=_TYPE_MAP.get(field_info["type"], str),
                     primary_key=field_info["primary_key"],
                     nullable=field_info["nullable"],
                     unique=field_info["unique"]
                 )
             
-            # Create table
-            table = Table(table_name, schema)
+            # Create table, keeping the copy mode of a table it replaces
+            previous = self.tables.get(table_name)
+            table = Table(
+                table_name, schema,
+                defensive_copy=previous.defensive_copy if previous else True
+            )
             
             # Load records
-            records = self.storage.load_records(table_name)
+            records = all_records[table_name]
             table.data = records
+            table._rebuild_indexes()
             
             # Update next_id based on existing records
             if table.primary_key_field:
@@ -238,12 +157,14 @@ class Database:
                     table._next_id = max(existing_ids) + 1
             
             self.tables[table_name] = table
+            if table_name in self._bound_classes:
+                self._bind_class(table_name, self._bound_classes[table_name])
         
         return len(self.tables)
     
     def get_stats(self) -> Dict[str, Any]:
         """Get database statistics."""
-        stats = {
+        stats: Dict[str, Any] = {
             "name": self.name,
             "persist": self.persist,
             "tables": {}
@@ -261,10 +182,21 @@ class Database:
         
         return stats
     
-    def checkpoint(self):
-        """Checkpoint the Write-Ahead Log."""
+    def checkpoint(self, wait: bool = True):
+        """Checkpoint the Write-Ahead Log (in the background if wait is False)."""
         if self.persist and self.storage:
-            self.storage.checkpoint()
+            self.storage.checkpoint(wait=wait)
+    
+    def close(self):
+        """
+        Flush and close the Write-Ahead Log and stop the I/O threads.
+        A later write reopens the log and save() starts new threads.
+        """
+        if self._io_pool is not None:
+            self._io_pool.shutdown()
+            self._io_pool = None
+        if self.persist and self.storage:
+            self.storage.close()
     
     def export_table(self, table_name: str, output_file: str):
         """Export a table to JSON."""
@@ -276,7 +208,7 @@ class Database:
 _default_db = Database()
 
 
-def table(db: Database = None):
+def table(db: Optional[Database] = None):
     """
     Decorator to convert a dataclass into a database table.
     
@@ -293,64 +225,95 @@ def table(db: Database = None):
         if not hasattr(cls, '__dataclass_fields__'):
             raise ValueError(f"{cls.__name__} must be a dataclass")
         
+        # Read the dataclass field metadata once, as plain tuples of
+        # (name, type, primary_key, nullable, unique, default)
+        cls.__table_fields__ = tuple(
+            (
+                field_obj.name,
+                field_obj.type,
+                field_obj.metadata.get('primary_key', False),
+                field_obj.metadata.get(
+                    'nullable',
+                    field_obj.default is not None or field_obj.default_factory is not None
+                ),
+                field_obj.metadata.get('unique', False),
+                field_obj.default,
+            )
+            for field_obj in fields(cls)
+        )
+        
         # Extract schema from dataclass
-        schema = {}
-        for field_name, field_obj in cls.__dataclass_fields__.items():
-            field_type = field_obj.type
-            
-            # Get metadata
-            metadata = field_obj.metadata or {}
-            primary_key = metadata.get('primary_key', False)
-            nullable = metadata.get('nullable', field_obj.default is not None or field_obj.default_factory is not None)
-            unique = metadata.get('unique', False)
-            
-            schema[field_name] = Field(
+        schema = {
+            field_name: Field(
                 field_type=field_type,
                 primary_key=primary_key,
                 nullable=nullable,
                 unique=unique
             )
+            for field_name, field_type, primary_key, nullable, unique, _ in cls.__table_fields__
+        }
         
         # Create table in database
         target_db = db or _default_db
         table_name = cls.__name__.lower()
-        target_db.create_table(table_name, schema)
+        # Generated insert() passes its own fresh kwargs dict, so skip the copy
+        target_db.create_table(table_name, schema, defensive_copy=False)
         
         # Add helper methods to the class
         cls._table_name = table_name
         cls._db = target_db
+        target_db._bind_class(table_name, cls)
         
         @classmethod
         def insert(cls_self, **kwargs):
             """Insert a record into the table."""
-            table_obj = cls_self._db.get_table(cls_self._table_name)
+            table_obj = cls_self._table
+            if table_obj is None:
+                table_obj = cls_self._db.get_table(cls_self._table_name)
             return table_obj.insert(kwargs)
         
         @classmethod
-        def select(cls_self, where=None, order_by=None, limit=None):
+        def insert_many(cls_self, records):
+            """Insert a batch of records into the table."""
+            table_obj = cls_self._table
+            if table_obj is None:
+                table_obj = cls_self._db.get_table(cls_self._table_name)
+            return table_obj.insert_many(records)
+        
+        @classmethod
+        def select(cls_self, where=None, order_by=None, limit=None, as_tuple=False):
             """Query records from the table."""
-            table_obj = cls_self._db.get_table(cls_self._table_name)
-            return table_obj.select(where=where, order_by=order_by, limit=limit)
+            table_obj = cls_self._table
+            if table_obj is None:
+                table_obj = cls_self._db.get_table(cls_self._table_name)
+            return table_obj.select(where=where, order_by=order_by, limit=limit, as_tuple=as_tuple)
         
         @classmethod
         def update(cls_self, where, **kwargs):
             """Update records in the table."""
-            table_obj = cls_self._db.get_table(cls_self._table_name)
+            table_obj = cls_self._table
+            if table_obj is None:
+                table_obj = cls_self._db.get_table(cls_self._table_name)
             return table_obj.update(where=where, updates=kwargs)
         
         @classmethod
         def delete(cls_self, where):
             """Delete records from the table."""
-            table_obj = cls_self._db.get_table(cls_self._table_name)
+            table_obj = cls_self._table
+            if table_obj is None:
+                table_obj = cls_self._db.get_table(cls_self._table_name)
             return table_obj.delete(where=where)
         
         @classmethod
         def count(cls_self):
             """Count records in the table."""
-            table_obj = cls_self._db.get_table(cls_self._table_name)
+            table_obj = cls_self._table
+            if table_obj is None:
+                table_obj = cls_self._db.get_table(cls_self._table_name)
             return table_obj.count()
         
         cls.insert = insert
+        cls.insert_many = insert_many
         cls.select = select
         cls.update = update
         cls.delete = delete
@@ -57,8 +57,7 @@ def seed_data():
         {"name": "Frank Miller", "email": "frank@university.edu", "age": 23, "gpa": 2.9, "major": "Computer Science"},
     ]
     
-    for student in students_data:
-        Student.insert(**student)
+    Student.insert_many(students_data)
     
     print(f"✓ Inserted {len(students_data)} students")
     
@@ -72,8 +71,7 @@ def seed_data():
         {"code": "PHYS101", "name": "Physics I", "credits": 4, "instructor": "Dr. Wilson"},
     ]
     
-    for course in courses_data:
-        Course.insert(**course)
+    Course.insert_many(courses_data)
     
     print(f"✓ Inserted {len(courses_data)} courses")
     
@@ -107,8 +105,7 @@ def seed_data():
         {"student_id": 6, "course_id": 2, "semester": "Spring 2026", "grade": None},
     ]
     
-    for registration in registrations_data:
-        Registration.insert(**registration)
+    Registration.insert_many(registrations_data)
     
     print(f"✓ Inserted {len(registrations_data)} registrations\n")
 
@@ -144,7 +141,7 @@ def run_sample_queries():
     # Query 2: Students with GPA > 3.5
     print_results(
         "Query 2: Students with GPA > 3.5",
-        Student.select(where=lambda s: s['gpa'] > 3.5)
+        Student.select(where={'gpa': ('>', 3.5)})
     )
     
     # Query 3: Computer Science majors
@@ -162,7 +159,7 @@ def run_sample_queries():
     # Query 5: Courses with 4 credits
     print_results(
         "Query 5: 4-Credit Courses",
-        Course.select(where=lambda c: c['credits'] == 4)
+        Course.select(where={'credits': ('==', 4)})
     )
     
     # Query 6: Spring 2026 registrations (current semester)
@@ -186,7 +183,7 @@ def run_sample_queries():
     # Query 9: Young students (age <= 20)
     print_results(
         "Query 9: Students Age 20 or Younger",
-        Student.select(where=lambda s: s['age'] <= 20, order_by='age')
+        Student.select(where={'age': ('<=', 20)}, order_by='age')
     )
     
     # Query 10: CS courses (course codes starting with 'CS')
@@ -5,6 +5,7 @@ Shows how to save/load data and inspect the file structure.
 
 from dataclasses import dataclass, field
 from database import Database, table, Field
+from persistence import count_lines, format_wal_timestamp
 import json
 from pathlib import Path
 
@@ -81,7 +82,7 @@ def demonstrate_basic_persistence():
     return db
 
 
-def demonstrate_file_structure():
+def demonstrate_file_structure(db: Database):
     """Show the file structure on disk."""
     print_header("PART 3: Inspecting File Structure")
     
@@ -98,10 +99,10 @@ def demonstrate_file_structure():
             size = schema_file.stat().st_size
             print(f"      {schema_file.name} ({size} bytes)")
             
-            # Show schema content
-            with open(schema_file, 'r') as f:
-                schema_data = json.load(f)
-                print(f"        Fields: {', '.join(schema_data['schema'].keys())}")
+            # Show schema content (cached by the storage engine)
+            table_name = schema_file.name[:-len(".schema.json")]
+            schema_data = db.storage.load_schema(table_name)
+            print(f"        Fields: {', '.join(schema_data['schema'].keys())}")
     
     # Show data files
     data_path = db_path / "data"
@@ -109,15 +110,13 @@ def demonstrate_file_structure():
         print(f"    data/")
         for data_file in sorted(data_path.glob("*.records")):
             size = data_file.stat().st_size
-            record_count = sum(1 for _ in open(data_file))
+            record_count = count_lines(data_file)
             print(f"      {data_file.name} ({size} bytes, {record_count} records)")
             
             # Show first record as example
-            with open(data_file, 'r') as f:
-                first_line = f.readline().strip()
-                if first_line:
-                    record = json.loads(first_line)
-                    print(f"        Example: {record}")
+            record = db.storage.first_record(data_file.stem)
+            if record:
+                print(f"        Example: {record}")
     
     # Show WAL
     wal_path = db_path / "wal"
@@ -125,7 +124,7 @@ def demonstrate_file_structure():
         print(f"    wal/")
         for wal_file in sorted(wal_path.glob("*.log")):
             size = wal_file.stat().st_size
-            entry_count = sum(1 for _ in open(wal_file))
+            entry_count = count_lines(wal_file)
             print(f"      {wal_file.name} ({size} bytes, {entry_count} entries)")
 
 
@@ -217,7 +216,7 @@ def demonstrate_wal_inspection():
         for i, entry in enumerate(recent_entries, 1):
             print(f"\n  {i}. Operation: {entry['operation']}")
             print(f"     Table: {entry['table']}")
-            print(f"     Time: {entry['timestamp']}")
+            print(f"     Time: {format_wal_timestamp(entry['timestamp'])}")
             
             if entry.get('record'):
                 print(f"     Record: {entry['record']}")
@@ -291,7 +290,7 @@ def main():
     
     # Run demonstrations
     db = demonstrate_basic_persistence()
-    demonstrate_file_structure()
+    demonstrate_file_structure(db)
     demonstrate_loading()
     demonstrate_updates_and_persistence()
     demonstrate_wal_inspection()
@@ -3,13 +3,250 @@ Persistence layer for the in-memory database.
 Implements record-based file storage with Write-Ahead Logging (WAL).
 """
 
+import array
 import json
+import math
+import mmap
+from json.encoder import encode_basestring
 import os
+import shutil
+import struct
+import sys
+import threading
+import time
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, BinaryIO, Callable, Iterator, List, Optional, Tuple
 from datetime import datetime
 from enum import Enum
 
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore[assignment]
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import numpy as np
+except ImportError:
+    np = None  # type: ignore[assignment]
+
+
+# One shared encoder: json.dumps with non-default arguments builds a
+# new JSONEncoder on every call. Non-ASCII text is written as UTF-8,
+# matching orjson, instead of as \u escapes.
+_json_encode = json.JSONEncoder(separators=(',', ':'), ensure_ascii=False).encode
+
+
+def _has_non_finite(obj: Any) -> bool:
+    """Check whether an object holds a NaN or infinite float anywhere."""
+    if isinstance(obj, float):
+        return not math.isfinite(obj)
+    if isinstance(obj, dict):
+        return any(_has_non_finite(value) for value in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return any(_has_non_finite(value) for value in obj)
+    return False
+
+
+# Records and WAL entries are (de)serialized with orjson when it is
+# installed, falling back to the standard library json module
+if orjson is not None:
+    def _dumps(obj: Any) -> bytes:
+        """
+        Serialize an object to compact JSON bytes.
+        orjson rejects ints wider than 64 bits and writes NaN and infinity
+        as null; such objects are written by the json module instead.
+        """
+        try:
+            data = orjson.dumps(obj)
+        except TypeError:
+            return _json_encode(obj).encode()
+        # Only output with a null in it can hide a non-finite float
+        if b'null' in data and _has_non_finite(obj):
+            return _json_encode(obj).encode()
+        return data
+    
+    def _loads(data: bytes) -> Any:
+        """Parse JSON bytes, including the NaN/Infinity tokens orjson rejects."""
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            return json.loads(data)
+else:
+    def _dumps(obj: Any) -> bytes:
+        """Serialize an object to compact JSON bytes."""
+        return _json_encode(obj).encode()
+    
+    _loads = json.loads
+
+# Buffer size for bulk writes of whole data files
+_WRITE_BUFFER_SIZE = 1 << 20
+
+# Bytes read from the start of a data file to preview its first record
+_PREVIEW_SIZE = 4096
+
+# Number of queued WAL entries that triggers a write to disk
+_WAL_BATCH_SIZE = 64
+
+# WAL size from which Database.save() starts a checkpoint in the background
+_CHECKPOINT_THRESHOLD = 64 << 20
+
+# When files are fsynced:
+#   'none'  - never; writes are left in the OS page cache
+#   'batch' - on Database.save() and checkpoint()
+#   'fsync' - after every WAL and data file write
+DURABILITY_MODES = ('none', 'batch', 'fsync')
+
+# How records are laid out in a table's data file:
+#   'json'    - JSON Lines, one record per line
+#   'json-lp' - JSON payloads, each prefixed by its length as a
+#               little-endian u32, so readers never scan for newlines;
+#               the WAL is framed the same way (transaction.lp.log)
+#   'msgpack' - msgpack payloads with the same length prefix
+#               (requires the msgpack package)
+RECORD_FORMATS = ('json', 'json-lp', 'msgpack')
+_FRAMED_FORMATS = ('json-lp', 'msgpack')
+
+# How WAL entries are timestamped:
+#   'ns'  - integer nanoseconds since the epoch (cheap to produce)
+#   'iso' - ISO 8601 local time string (readable in the raw log)
+WAL_TIMESTAMP_FORMATS = ('ns', 'iso')
+_FRAME_HEADER = struct.Struct('<I')
+
+
+def count_lines(path: Path) -> int:
+    """Count the lines in a file by counting newline bytes in 1 MiB chunks."""
+    count = 0
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(_WRITE_BUFFER_SIZE)
+            if not chunk:
+                break
+            count += chunk.count(b'\n')
+    return count
+
+
+# Python expressions that render a field value of a known type as JSON text
+_JSON_FIELD_ENCODERS = {
+    'int': ("type({v}) is int", "str({v})"),
+    'float': ("type({v}) is float and {v} - {v} == 0.0", "repr({v})"),
+    'str': ("type({v}) is str", "_escape({v})"),
+    'bool': ("{v} is True or {v} is False", "('true' if {v} else 'false')"),
+}
+
+
+def _compile_record_encoder(field_types: Dict[str, str]) -> Callable[[Dict[str, Any]], bytes]:
+    """
+    Build a JSON Lines encoder specialized to one table schema.
+    
+    The generated function reads each field by name and emits it into a
+    fixed template, skipping the generic per-key work of json.dumps. Records
+    that don't match the schema exactly (missing or extra fields, values of
+    another type, NaN/infinity) go through _dumps instead.
+    """
+    fallback = lambda record: _dumps(record) + b'\n'
+    if not field_types:
+        return fallback
+    
+    lines = ["def encode(record):",
+             f"    if len(record) != {len(field_types)}:",
+             "        return _fallback(record)",
+             "    try:"]
+    lines += [f"        f{i} = record[{name!r}]" for i, name in enumerate(field_types)]
+    lines += ["    except KeyError:",
+              "        return _fallback(record)"]
+    
+    parts = []
+    for i, (name, type_name) in enumerate(field_types.items()):
+        var = f"f{i}"
+        lines.append(f"    if {var} is None:")
+        lines.append(f"        s{i} = 'null'")
+        if type_name in _JSON_FIELD_ENCODERS:
+            check, render = _JSON_FIELD_ENCODERS[type_name]
+            lines.append(f"    elif {check.format(v=var)}:")
+            lines.append(f"        s{i} = {render.format(v=var)}")
+            lines.append("    else:")
+            lines.append("        return _fallback(record)")
+        else:
+            lines.append("    else:")
+            lines.append(f"        s{i} = _json_text({var})")
+        
+        key = encode_basestring(name)
+        parts.append(repr(('{' if i == 0 else ',') + key + ':') + f" + s{i}")
+    
+    lines.append(f"    return ({' + '.join(parts)} + '}}\\n').encode()")
+    
+    namespace: Dict[str, Any] = {
+        '_escape': encode_basestring,
+        '_json_text': json.JSONEncoder(separators=(',', ':'), ensure_ascii=False).encode,
+        '_fallback': fallback,
+    }
+    exec("\n".join(lines), namespace)
+    return namespace['encode']
+
+
+def format_wal_timestamp(timestamp: Any) -> str:
+    """Render a WAL entry timestamp of either format as an ISO 8601 string."""
+    if isinstance(timestamp, int):
+        seconds, nanoseconds = divmod(timestamp, 1_000_000_000)
+        return datetime.fromtimestamp(seconds).replace(microsecond=nanoseconds // 1000).isoformat()
+    return timestamp
+
+
+def _flush_pending_wal(pending: List[bytes], wal_file: Path):
+    """Append queued WAL entries, unless the database directory was removed."""
+    if pending and wal_file.parent.exists():
+        with open(wal_file, 'ab') as f:
+            f.write(b''.join(pending))
+        pending.clear()
+
+
+def _frame(payload: bytes) -> bytes:
+    """Prefix a payload with its length."""
+    return _FRAME_HEADER.pack(len(payload)) + payload
+
+
+def _frame_codec(record_format: str) -> Tuple[Callable[[Any], bytes], Callable[[bytes], Any]]:
+    """Get the payload encoder and decoder for a framed record format."""
+    if record_format == 'msgpack':
+        return (lambda record: msgpack.packb(record, use_bin_type=True),
+                lambda payload: msgpack.unpackb(payload, raw=False))
+    return _dumps, _loads
+
+
+def _iter_frames(f: BinaryIO) -> Iterator[bytes]:
+    """Yield the payloads of length-prefixed frames, stopping at a truncated frame."""
+    while True:
+        header = f.read(_FRAME_HEADER.size)
+        if len(header) < _FRAME_HEADER.size:
+            return
+        size, = _FRAME_HEADER.unpack(header)
+        payload = f.read(size)
+        if len(payload) < size:
+            return
+        yield payload
+
+
+def _count_frames(path: Path) -> int:
+    """Count the length-prefixed frames in a file by skipping over payloads."""
+    count = 0
+    with open(path, 'rb') as f:
+        file_size = os.fstat(f.fileno()).st_size
+        while True:
+            header = f.read(_FRAME_HEADER.size)
+            if len(header) < _FRAME_HEADER.size:
+                return count
+            size, = _FRAME_HEADER.unpack(header)
+            if f.seek(size, os.SEEK_CUR) > file_size:
+                return count  # Truncated frame, as _iter_frames skips it
+            count += 1
+
 
 class OperationType(Enum):
     """Types of operations for the WAL."""
@@ -29,13 +266,33 @@ class StorageEngine:
             schema/
                 table_name.schema.json      # Table schema definition
             data/
-                table_name.records          # One JSON record per line
+                table_name.records          # One JSON record per line (or length-prefixed frames)
             wal/
                 transaction.log             # Write-Ahead Log for durability
+                                            # (transaction.lp.log when framed)
     """
     
-    def __init__(self, db_name: str, base_path: str = "./data"):
+    def __init__(self, db_name: str, base_path: str = "./data", durability: str = "batch",
+                 record_format: str = "json", wal_timestamp: str = "ns"):
+        if durability not in DURABILITY_MODES:
+            raise ValueError(f"Unknown durability mode: {durability}")
+        if wal_timestamp not in WAL_TIMESTAMP_FORMATS:
+            raise ValueError(f"Unknown WAL timestamp format: {wal_timestamp}")
+        if record_format not in RECORD_FORMATS:
+            raise ValueError(f"Unknown record format: {record_format}")
+        if record_format == 'msgpack' and msgpack is None:
+            raise ImportError("The msgpack package is required for record_format='msgpack'")
+        
         self.db_name = db_name
+        self.durability = durability
+        # Format for new tables; existing tables keep the one in their schema file
+        self.record_format = record_format
+        # A 'json-lp' engine also frames its WAL entries, in a separate log file
+        self._wal_framed = record_format == 'json-lp'
+        self.wal_timestamp = wal_timestamp
+        self._timestamp: Callable[[], Any] = (
+            time.time_ns if wal_timestamp == 'ns' else lambda: datetime.now().isoformat()
+        )
         self.base_path = Path(base_path)
         self.db_path = self.base_path / db_name
         
@@ -44,7 +301,30 @@ class StorageEngine:
         self.data_path = self.db_path / "data"
         self.wal_path = self.db_path / "wal"
         
+        # Serialized WAL entries waiting to be written in one batch
+        self._wal_pending: List[bytes] = []
+        # WAL file handle, opened on first write and kept open
+        self._wal_fp: Optional[BinaryIO] = None
+        # Parsed schema files keyed by table name, with the mtime they were read at
+        self._schema_cache: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+        # Generated record encoders, keyed by table name with the schema they were built from
+        self._encoders: Dict[str, Tuple[Dict[str, Any], Callable[[Dict[str, Any]], bytes]]] = {}
+        
+        # Checkpoints run on their own thread; the lock keeps WAL writes
+        # from interleaving with the archive-and-reopen step
+        self._wal_lock = threading.Lock()
+        self._wal_size = 0
+        self._checkpointer: Optional[ThreadPoolExecutor] = None
+        self._pending_checkpoint: Optional[Future] = None
+        
+        # Entries already parsed by replay_wal() and where they end in the WAL
+        self._wal_replay_offset = 0
+        self._wal_replay_entries: List[Dict[str, Any]] = []
+        
         self._ensure_directories()
+        # Write entries still queued when the engine is garbage collected or
+        # the interpreter exits; the finalizer holds no reference to the engine
+        weakref.finalize(self, _flush_pending_wal, self._wal_pending, self._get_wal_file())
     
     def _ensure_directories(self):
         """Create necessary directories if they don't exist."""
@@ -60,29 +340,114 @@ class StorageEngine:
         """Get the path to a table's data file."""
         return self.data_path / f"{table_name}.records"
     
+    def _table_format(self, table_name: str) -> str:
+        """Get the record format a table's data file is written in."""
+        schema_data = self.load_schema(table_name)
+        if schema_data is None:
+            return self.record_format
+        return schema_data.get("format", "json")
+    
+    def _encode_records(self, table_name: str, records: List[Dict[str, Any]]) -> bytes:
+        """Serialize records into the bytes of the table's data file."""
+        record_format = self._table_format(table_name)
+        if record_format in _FRAMED_FORMATS:
+            encode, _ = _frame_codec(record_format)
+            return b''.join([_frame(encode(record)) for record in records])
+        if orjson is None:
+            # orjson beats a generated encoder; json.dumps does not
+            encode = self._record_encoder(table_name)
+            return b''.join([encode(record) for record in records])
+        return b''.join([_dumps(record) + b'\n' for record in records])
+    
+    def _record_encoder(self, table_name: str) -> Callable[[Dict[str, Any]], bytes]:
+        """Get the generated JSON Lines encoder for a table's current schema."""
+        schema_data = self.load_schema(table_name)
+        if schema_data is None:
+            return lambda record: _dumps(record) + b'\n'
+        
+        cached = self._encoders.get(table_name)
+        if cached is None or cached[0] is not schema_data:
+            field_types = {
+                field_name: field_info["type"]
+                for field_name, field_info in schema_data["schema"].items()
+            }
+            cached = (schema_data, _compile_record_encoder(field_types))
+            self._encoders[table_name] = cached
+        return cached[1]
+    
     def _get_wal_file(self) -> Path:
         """Get the path to the Write-Ahead Log."""
-        return self.wal_path / "transaction.log"
+        return self.wal_path / ("transaction.lp.log" if self._wal_framed else "transaction.log")
     
-    def _write_wal_entry(self, operation: OperationType, table_name: str, 
-                         record: Optional[Dict[str, Any]] = None,
-                         old_record: Optional[Dict[str, Any]] = None):
-        """Write an operation to the Write-Ahead Log."""
-        wal_entry = {
-            "timestamp": datetime.now().isoformat(),
+    def _wal_entry(self, operation: OperationType, table_name: str,
+                   record: Optional[Dict[str, Any]] = None,
+                   old_record: Optional[Dict[str, Any]] = None) -> bytes:
+        """Serialize an operation as one Write-Ahead Log line (or frame)."""
+        entry = _dumps({
+            "timestamp": self._timestamp(),
             "operation": operation.value,
             "table": table_name,
             "record": record,
             "old_record": old_record
-        }
-        
-        wal_file = self._get_wal_file()
-        with open(wal_file, 'a') as f:
-            f.write(json.dumps(wal_entry) + '\n')
+        })
+        return _frame(entry) if self._wal_framed else entry + b'\n'
+    
+    def _append_wal(self, data: bytes):
+        """Append serialized entries to the Write-Ahead Log in one write."""
+        with self._wal_lock:
+            if self._wal_fp is None:
+                self._wal_fp = open(self._get_wal_file(), 'ab', buffering=1 << 16)
+            self._wal_fp.write(data)
+            self._wal_fp.flush()
+            if self.durability == 'fsync':
+                os.fsync(self._wal_fp.fileno())
+            self._wal_size = self._wal_fp.tell()
+    
+    def _write_wal_entry(self, operation: OperationType, table_name: str, 
+                         record: Optional[Dict[str, Any]] = None,
+                         old_record: Optional[Dict[str, Any]] = None):
+        """
+        Queue an operation for the Write-Ahead Log.
+        Entries are written in batches, or one at a time with durability 'fsync'.
+        """
+        self._wal_pending.append(self._wal_entry(operation, table_name, record, old_record))
+        if self.durability == 'fsync' or len(self._wal_pending) >= _WAL_BATCH_SIZE:
+            self.flush_wal()
+    
+    def flush_wal(self):
+        """Write all queued WAL entries to disk in one write."""
+        if self._wal_pending:
+            data = b''.join(self._wal_pending)
+            self._wal_pending.clear()
+            self._append_wal(data)
+    
+    def sync(self):
+        """Write queued WAL entries and, unless durability is 'none', fsync the WAL."""
+        self.flush_wal()
+        if self._wal_fp is not None and self.durability != 'none':
+            os.fsync(self._wal_fp.fileno())
+    
+    def _close_wal(self):
+        """Close the WAL file handle; the next write reopens it."""
+        with self._wal_lock:
+            if self._wal_fp is not None:
+                self._wal_fp.close()
+                self._wal_fp = None
+    
+    def close(self):
+        """Write any queued WAL entries and release open files."""
+        if self._pending_checkpoint is not None:
+            self._pending_checkpoint.result()
+        self.flush_wal()
+        self._close_wal()
+        if self._checkpointer is not None:
+            self._checkpointer.shutdown()
+            self._checkpointer = None
     
     def save_schema(self, table_name: str, schema: Dict[str, Any]):
         """Save table schema to disk."""
         schema_file = self._get_schema_file(table_name)
+        self._schema_cache.pop(table_name, None)
         
         # Convert Field objects to serializable dict
         serializable_schema = {}
@@ -98,50 +463,138 @@ class StorageEngine:
             json.dump({
                 "table_name": table_name,
                 "schema": serializable_schema,
+                "format": self.record_format,
                 "created_at": datetime.now().isoformat()
             }, f, indent=2)
         
         self._write_wal_entry(OperationType.CREATE_TABLE, table_name)
     
     def load_schema(self, table_name: str) -> Optional[Dict[str, Any]]:
-        """Load table schema from disk."""
+        """
+        Load table schema from disk.
+        The parsed schema is cached until the file changes, so the returned
+        dict is shared between calls and must not be modified.
+        """
         schema_file = self._get_schema_file(table_name)
         
-        if not schema_file.exists():
+        try:
+            mtime = schema_file.stat().st_mtime_ns
+        except FileNotFoundError:
+            self._schema_cache.pop(table_name, None)
             return None
         
+        cached = self._schema_cache.get(table_name)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        
         with open(schema_file, 'r') as f:
-            return json.load(f)
+            schema_data = json.load(f)
+        self._schema_cache[table_name] = (mtime, schema_data)
+        return schema_data
     
     def save_records(self, table_name: str, records: List[Dict[str, Any]]):
         """
         Save all records to disk (overwrites existing file).
-        Uses JSON Lines format - one record per line.
+        Uses JSON Lines format - one record per line - unless the table
+        was created with a length-prefixed record format.
+        
+        The records are written to a temporary file that then atomically
+        replaces the data file, so a crash mid-save leaves the old data intact.
         """
         data_file = self._get_data_file(table_name)
+        tmp_file = data_file.with_suffix('.records.tmp')
         
-        with open(data_file, 'w') as f:
-            for record in records:
-                f.write(json.dumps(record) + '\n')
+        # Serialize everything up front and hand it to the OS in one write
+        payload = self._encode_records(table_name, records)
+        with open(tmp_file, 'wb', buffering=_WRITE_BUFFER_SIZE) as f:
+            f.write(payload)
+            if self.durability != 'none':
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_file, data_file)
     
-    def load_records(self, table_name: str) -> List[Dict[str, Any]]:
+    def iter_records(self, table_name: str) -> Iterator[Dict[str, Any]]:
         """
-        Load all records from disk.
-        Reads JSON Lines format.
+        Iterate over the records on disk one at a time.
+        Reads the data file without holding the whole table in memory;
+        JSON Lines files are memory-mapped and sliced line by line.
         """
         data_file = self._get_data_file(table_name)
         
         if not data_file.exists():
-            return []
+            return
         
-        records = []
-        with open(data_file, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if line:  # Skip empty lines
-                    records.append(json.loads(line))
+        record_format = self._table_format(table_name)
+        with open(data_file, 'rb') as f:
+            if record_format in _FRAMED_FORMATS:
+                _, decode = _frame_codec(record_format)
+                for payload in _iter_frames(f):
+                    yield decode(payload)
+                return
+            
+            size = os.fstat(f.fileno()).st_size
+            if size == 0:
+                return  # Empty files can't be mapped
+            
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                pos = 0
+                while pos < size:
+                    end = mm.find(b'\n', pos)
+                    if end == -1:
+                        end = size
+                    line = mm[pos:end].strip()
+                    pos = end + 1
+                    if line:  # Skip empty lines
+                        yield _loads(line)
+    
+    def first_record(self, table_name: str) -> Optional[Dict[str, Any]]:
+        """
+        Read just the first record of a table, e.g. for a preview.
+        Only the start of the data file is read and parsed.
+        """
+        data_file = self._get_data_file(table_name)
         
-        return records
+        if not data_file.exists():
+            return None
+        
+        record_format = self._table_format(table_name)
+        with open(data_file, 'rb') as f:
+            if record_format in _FRAMED_FORMATS:
+                _, decode = _frame_codec(record_format)
+                for payload in _iter_frames(f):
+                    return decode(payload)
+                return None
+            
+            head = f.read(_PREVIEW_SIZE)
+            while head:
+                end = head.find(b'\n')
+                if end == -1:
+                    # The line runs past the preview window
+                    head += f.readline()
+                    end = len(head)
+                line = head[:end].strip()
+                if line:
+                    return _loads(line)
+                # Skip empty lines, as iter_records does
+                head = head[end + 1:] or f.read(_PREVIEW_SIZE)
+            return None
+    
+    def load_records(self, table_name: str) -> List[Dict[str, Any]]:
+        """
+        Load all records from disk.
+        """
+        return list(self.iter_records(table_name))
+    
+    def load_all(self, table_names: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Load the records of several tables at once.
+        Each table's data file is read on its own thread; file reads release
+        the GIL, so loading takes about as long as the largest table.
+        """
+        if not table_names:
+            return {}
+        with ThreadPoolExecutor(max_workers=min(32, len(table_names))) as pool:
+            return dict(zip(table_names, pool.map(self.load_records, table_names)))
     
     def append_record(self, table_name: str, record: Dict[str, Any]):
         """
@@ -152,10 +605,35 @@ class StorageEngine:
         
         # Write to WAL first
         self._write_wal_entry(OperationType.INSERT, table_name, record)
+        self.flush_wal()
         
         # Then append to data file
-        with open(data_file, 'a') as f:
-            f.write(json.dumps(record) + '\n')
+        with open(data_file, 'ab') as f:
+            f.write(self._encode_records(table_name, [record]))
+            if self.durability == 'fsync':
+                f.flush()
+                os.fsync(f.fileno())
+    
+    def append_records(self, table_name: str, records: List[Dict[str, Any]]):
+        """
+        Append a batch of records to the data file.
+        Issues one WAL write and one data file write for the whole batch.
+        """
+        data_file = self._get_data_file(table_name)
+        
+        # Write to WAL first
+        self._wal_pending.extend([
+            self._wal_entry(OperationType.INSERT, table_name, record)
+            for record in records
+        ])
+        self.flush_wal()
+        
+        # Then append to data file
+        with open(data_file, 'ab', buffering=_WRITE_BUFFER_SIZE) as f:
+            f.write(self._encode_records(table_name, records))
+            if self.durability == 'fsync':
+                f.flush()
+                os.fsync(f.fileno())
     
     def update_records(self, table_name: str, records: List[Dict[str, Any]], 
                        updated_records: List[Dict[str, Any]]):
@@ -186,11 +664,16 @@ class StorageEngine:
         data_file = self._get_data_file(table_name)
         
         self._write_wal_entry(OperationType.DROP_TABLE, table_name)
+        self._schema_cache.pop(table_name, None)
         
         if schema_file.exists():
             schema_file.unlink()
         if data_file.exists():
-            data_file.unlink()
+            self._remove_data(data_file)
+    
+    def _remove_data(self, data_file: Path):
+        """Delete a table's data file."""
+        data_file.unlink()
     
     def list_tables(self) -> List[str]:
         """List all tables by scanning schema files."""
@@ -203,6 +686,7 @@ class StorageEngine:
     
     def get_stats(self) -> Dict[str, Any]:
         """Get statistics about the database on disk."""
+        self.flush_wal()
         stats = {
             "db_name": self.db_name,
             "db_path": str(self.db_path),
@@ -218,8 +702,7 @@ class StorageEngine:
             record_count = 0
             
             if data_file.exists():
-                table_size = data_file.stat().st_size
-                record_count = sum(1 for _ in open(data_file))
+                table_size, record_count = self._data_file_stats(table_name, data_file)
             
             stats["tables"][table_name] = {
                 "records": record_count,
@@ -234,72 +717,407 @@ class StorageEngine:
         wal_file = self._get_wal_file()
         if wal_file.exists():
             stats["wal_size_bytes"] = wal_file.stat().st_size
-            stats["wal_entries"] = sum(1 for _ in open(wal_file))
+            stats["wal_entries"] = _count_frames(wal_file) if self._wal_framed else count_lines(wal_file)
         else:
             stats["wal_size_bytes"] = 0
             stats["wal_entries"] = 0
         
         return stats
     
-    def checkpoint(self):
+    def _data_file_stats(self, table_name: str, data_file: Path) -> Tuple[int, int]:
+        """Get the size in bytes and the record count of a table's data file."""
+        if self._table_format(table_name) in _FRAMED_FORMATS:
+            return data_file.stat().st_size, _count_frames(data_file)
+        return data_file.stat().st_size, count_lines(data_file)
+    
+    def checkpoint(self, wait: bool = True):
         """
         Checkpoint the WAL - clear it after confirming all data is saved.
         In a production system, this would be more sophisticated.
+        
+        The WAL is archived on a background thread. With wait=False this
+        returns as soon as the checkpoint is queued. A checkpoint that is
+        queued but not yet running is reused rather than starting another;
+        one that is already running may have renamed the log before the
+        entries flushed here, so a new one is queued behind it.
         """
-        wal_file = self._get_wal_file()
-        if wal_file.exists():
-            # Archive the old WAL
-            archive_name = f"transaction.{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
-            archive_path = self.wal_path / archive_name
-            wal_file.rename(archive_path)
+        self.flush_wal()
+        
+        pending = self._pending_checkpoint
+        if pending is None or pending.running() or pending.done():
+            if self._checkpointer is None:
+                self._checkpointer = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix=f"{self.db_name}-checkpoint"
+                )
+            pending = self._checkpointer.submit(self._archive_wal)
+            self._pending_checkpoint = pending
+        
+        if wait:
+            pending.result()  # Re-raises any error from the checkpoint thread
+    
+    def checkpoint_if_large(self):
+        """
+        Start a background checkpoint once the WAL has grown past 64 MiB.
+        Only call this right after every table has been saved.
+        """
+        if self._wal_size >= _CHECKPOINT_THRESHOLD:
+            self.checkpoint(wait=False)
+    
+    def _archive_wal(self):
+        """Rename the current WAL to an archive file and start a new one."""
+        with self._wal_lock:
+            if self._wal_fp is not None:
+                if self.durability != 'none':
+                    os.fsync(self._wal_fp.fileno())
+                self._wal_fp.close()
+                self._wal_fp = None
             
-            # Create new empty WAL
-            wal_file.touch()
+            wal_file = self._get_wal_file()
+            if wal_file.exists():
+                # Archive the old WAL
+                prefix = "transaction.lp" if self._wal_framed else "transaction"
+                archive_name = f"{prefix}.{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}.log"
+                archive_path = self.wal_path / archive_name
+                wal_file.rename(archive_path)
+                
+                # Create new empty WAL
+                wal_file.touch()
+            self._wal_size = 0
+            self._wal_replay_offset = 0
+            self._wal_replay_entries = []
     
     def replay_wal(self) -> List[Dict[str, Any]]:
         """
         Read the WAL entries (useful for recovery).
         Returns list of operations.
+        
+        Entries already read are remembered along with the file offset they
+        end at, so repeated calls only parse what was appended since.
         """
+        self.flush_wal()
         wal_file = self._get_wal_file()
         
-        if not wal_file.exists():
-            return []
-        
-        operations = []
-        with open(wal_file, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if line:
-                    operations.append(json.loads(line))
-        
-        return operations
+        with self._wal_lock:
+            if not wal_file.exists():
+                self._wal_replay_offset = 0
+                self._wal_replay_entries = []
+                return []
+            
+            with open(wal_file, 'rb') as f:
+                # Start over if the log was replaced by something shorter
+                if f.seek(0, os.SEEK_END) < self._wal_replay_offset:
+                    self._wal_replay_offset = 0
+                    self._wal_replay_entries = []
+                
+                f.seek(self._wal_replay_offset)
+                if self._wal_framed:
+                    for payload in _iter_frames(f):
+                        self._wal_replay_offset += _FRAME_HEADER.size + len(payload)
+                        self._wal_replay_entries.append(_loads(payload))
+                    return list(self._wal_replay_entries)
+                
+                for line in f:
+                    if not line.endswith(b'\n'):
+                        break  # Partially written entry; read it next time
+                    self._wal_replay_offset += len(line)
+                    line = line.strip()
+                    if line:
+                        self._wal_replay_entries.append(_loads(line))
+            
+            return list(self._wal_replay_entries)
     
     def compact(self, table_name: str):
         """
         Compact a table's data file by rewriting it.
         Useful after many deletes/updates.
+        
+        The file holds no tombstones, so this is a byte-for-byte copy into a
+        fresh file that atomically replaces the old one; nothing is parsed.
         """
-        records = self.load_records(table_name)
-        self.save_records(table_name, records)
+        data_file = self._get_data_file(table_name)
+        if not data_file.exists():
+            data_file.touch()
+            return
+        
+        tmp_file = data_file.with_suffix('.records.tmp')
+        with open(data_file, 'rb') as src, open(tmp_file, 'wb') as dst:
+            shutil.copyfileobj(src, dst, _WRITE_BUFFER_SIZE)
+        os.replace(tmp_file, data_file)
     
     def export_table_to_json(self, table_name: str, output_file: str):
-        """Export a table to a standard JSON file."""
-        records = self.load_records(table_name)
-        with open(output_file, 'w') as f:
-            json.dump({
-                "table": table_name,
-                "records": records,
-                "count": len(records),
-                "exported_at": datetime.now().isoformat()
-            }, f, indent=2)
+        """
+        Export a table to a standard JSON file.
+        Records are streamed to the file one at a time rather than
+        serialized as one large document.
+        """
+        count = 0
+        with open(output_file, 'wb', buffering=_WRITE_BUFFER_SIZE) as f:
+            f.write(b'{\n  "table": ' + _dumps(table_name) + b',\n  "records": [')
+            for record in self.iter_records(table_name):
+                f.write(b',\n    ' if count else b'\n    ')
+                f.write(_dumps(record))
+                count += 1
+            f.write(b'\n  ],' if count else b'],')
+            f.write(b'\n  "count": ' + str(count).encode())
+            f.write(b',\n  "exported_at": ' + _dumps(datetime.now().isoformat()) + b'\n}\n')
     
     def import_table_from_json(self, table_name: str, input_file: str) -> int:
         """Import records from a JSON file."""
-        with open(input_file, 'r') as f:
-            data = json.load(f)
+        with open(input_file, 'rb') as f:
+            data = _loads(f.read())
         
         records = data.get("records", [])
         self.save_records(table_name, records)
         
         return len(records)
+
+
+class ColumnarStorageEngine(StorageEngine):
+    """
+    Storage engine that keeps each field of a table in its own file.
+    
+    File Structure:
+        db_name/
+            data/
+                table_name/
+                    rows                    # Record count
+                    field.col               # One file per field
+                    field.mask              # Null flags for numeric fields
+    
+    int and float columns are raw little-endian int64/float64 values (bool is
+    one byte per value), so a single column can be read without touching the
+    others. Nullable numeric columns store a companion .mask file with one
+    byte per row, 1 where the value is null. Strings are UTF-8 and any other
+    type is JSON, both prefixed by their length as a little-endian u32, with
+    0xFFFFFFFF standing for null.
+    """
+    
+    # Typecodes for reading numeric columns with the array module
+    _ARRAY_TYPECODES = {'int': 'q', 'float': 'd', 'bool': 'B'}
+    # Python types that numeric column values are converted to before packing
+    _COLUMN_TYPES: Dict[str, type] = {'int': int, 'float': float, 'bool': bool}
+    _NUMPY_DTYPES = {'int': '<i8', 'float': '<f8', 'bool': 'u1'}
+    _NULL_LENGTH = 0xFFFFFFFF
+    
+    def __init__(self, db_name: str, base_path: str = "./data", durability: str = "batch",
+                 wal_timestamp: str = "ns"):
+        super().__init__(db_name, base_path, durability, wal_timestamp=wal_timestamp)
+        # Recorded in schema files so the layout of each table is visible on disk
+        self.record_format = "columnar"
+    
+    def _get_data_file(self, table_name: str) -> Path:
+        """Get the path to a table's column directory."""
+        return self.data_path / table_name
+    
+    def _column_types(self, table_name: str) -> Dict[str, Tuple[str, bool]]:
+        """Get each field's type name and nullability from the table's schema."""
+        schema_data = self.load_schema(table_name)
+        if schema_data is None:
+            raise ValueError(f"Table {table_name} has no schema on disk")
+        return {
+            field_name: (field_info["type"], field_info["nullable"])
+            for field_name, field_info in schema_data["schema"].items()
+        }
+    
+    def _encode_column(self, type_name: str, values: List[Any]) -> bytes:
+        """
+        Encode one column's values into the bytes of its .col file.
+        
+        Values of another type (which Field.validate accepts if they can be
+        coerced) are converted to the column's type. A numeric value that
+        would change in the conversion, such as 3.5 in an int column, or a
+        non-bool in a bool column raises ValueError instead.
+        """
+        if type_name in self._ARRAY_TYPECODES:
+            convert = self._COLUMN_TYPES[type_name]
+            numbers = []
+            for value in values:
+                if value is None:
+                    value = 0
+                elif type(value) is not convert:
+                    converted = None if type_name == 'bool' else convert(value)
+                    if converted is None or converted != value:
+                        raise ValueError(f"{value!r} can't be stored exactly as {type_name}")
+                    value = converted
+                numbers.append(value)
+            column = array.array(self._ARRAY_TYPECODES[type_name], numbers)
+            if sys.byteorder == 'big':
+                column.byteswap()
+            return column.tobytes()
+        
+        pack_header = _FRAME_HEADER.pack
+        null_header = pack_header(self._NULL_LENGTH)
+        chunks = []
+        for value in values:
+            if value is None:
+                chunks.append(null_header)
+                continue
+            if type_name == 'str':
+                payload = (value if type(value) is str else str(value)).encode()
+            else:
+                payload = _dumps(value)
+            chunks.append(pack_header(len(payload)))
+            chunks.append(payload)
+        return b''.join(chunks)
+    
+    def _read_numeric(self, column_file: Path, type_name: str) -> Any:
+        """Read a numeric .col file as a NumPy array, or a list without NumPy."""
+        if np is not None:
+            return np.fromfile(column_file, dtype=self._NUMPY_DTYPES[type_name])
+        column = array.array(self._ARRAY_TYPECODES[type_name])
+        column.frombytes(column_file.read_bytes())
+        if sys.byteorder == 'big':
+            column.byteswap()
+        return column.tolist()
+    
+    def _read_column(self, table_dir: Path, field_name: str, type_name: str) -> List[Any]:
+        """Read a column back into Python values, with None for nulls."""
+        column_file = table_dir / f"{field_name}.col"
+        if type_name in self._ARRAY_TYPECODES:
+            values = self._read_numeric(column_file, type_name)
+            values = values.tolist() if np is not None else values
+            if type_name == 'bool':
+                values = [bool(value) for value in values]
+            mask_file = table_dir / f"{field_name}.mask"
+            if mask_file.exists():
+                mask = mask_file.read_bytes()
+                values = [None if null else value for value, null in zip(values, mask)]
+            return values
+        
+        decoded: List[Any] = []
+        with open(column_file, 'rb') as f:
+            while True:
+                header = f.read(_FRAME_HEADER.size)
+                if len(header) < _FRAME_HEADER.size:
+                    break
+                size, = _FRAME_HEADER.unpack(header)
+                if size == self._NULL_LENGTH:
+                    decoded.append(None)
+                    continue
+                payload = f.read(size)
+                decoded.append(payload.decode() if type_name == 'str' else _loads(payload))
+        return decoded
+    
+    def _write_columns(self, table_name: str, records: List[Dict[str, Any]], mode: str):
+        """
+        Write or append records column by column.
+        
+        Every column is encoded before any file is opened, so a value that
+        can't be stored leaves the files on disk untouched. A rewrite ('wb')
+        goes through temporary files that replace the old ones, and the row
+        count is written last.
+        """
+        table_dir = self._get_data_file(table_name)
+        table_dir.mkdir(exist_ok=True)
+        
+        files = []
+        for field_name, (type_name, nullable) in self._column_types(table_name).items():
+            values = [record.get(field_name) for record in records]
+            try:
+                data = self._encode_column(type_name, values)
+            except ValueError as e:
+                raise ValueError(f"Column {field_name} of table {table_name}: {e}") from e
+            files.append((table_dir / f"{field_name}.col", data))
+            if nullable and type_name in self._ARRAY_TYPECODES:
+                mask = bytes(value is None for value in values)
+                files.append((table_dir / f"{field_name}.mask", mask))
+        
+        rows_file = table_dir / "rows"
+        row_count = len(records)
+        if mode == 'ab' and rows_file.exists():
+            row_count += int(rows_file.read_text())
+        
+        sync = self.durability == 'fsync' or (mode == 'wb' and self.durability == 'batch')
+        for path, data in files:
+            self._write_column_file(path, data, mode, sync)
+        self._write_column_file(rows_file, str(row_count).encode(), 'wb', sync)
+    
+    def _write_column_file(self, path: Path, data: bytes, mode: str, sync: bool):
+        """Append to a column file, or replace it through a temporary file."""
+        target = path
+        if mode == 'wb':
+            path = path.with_name(path.name + '.tmp')
+        with open(path, mode, buffering=_WRITE_BUFFER_SIZE) as f:
+            f.write(data)
+            if sync:
+                f.flush()
+                os.fsync(f.fileno())
+        if mode == 'wb':
+            os.replace(path, target)
+    
+    def save_records(self, table_name: str, records: List[Dict[str, Any]]):
+        """Save all records to disk, rewriting every column file."""
+        self._write_columns(table_name, records, 'wb')
+    
+    def iter_records(self, table_name: str) -> Iterator[Dict[str, Any]]:
+        """Iterate over the records on disk, reassembled from their columns."""
+        table_dir = self._get_data_file(table_name)
+        if not (table_dir / "rows").exists():
+            return
+        
+        columns = {
+            field_name: self._read_column(table_dir, field_name, type_name)
+            for field_name, (type_name, _) in self._column_types(table_name).items()
+        }
+        row_count = int((table_dir / "rows").read_text())
+        for field_name, values in columns.items():
+            if len(values) != row_count:
+                raise ValueError(
+                    f"Column {field_name} of table {table_name} has {len(values)} "
+                    f"values, expected {row_count}"
+                )
+        field_names = list(columns)
+        for values in zip(*columns.values()):
+            yield dict(zip(field_names, values))
+    
+    def load_column(self, table_name: str, field_name: str) -> Any:
+        """
+        Load a single column without reading the rest of the table.
+        Numeric columns come back as NumPy arrays when NumPy is installed
+        (masked arrays if the column has nulls); other columns as lists.
+        """
+        type_name, _ = self._column_types(table_name)[field_name]
+        table_dir = self._get_data_file(table_name)
+        
+        if np is None or type_name not in self._NUMPY_DTYPES:
+            return self._read_column(table_dir, field_name, type_name)
+        
+        values = self._read_numeric(table_dir / f"{field_name}.col", type_name)
+        mask_file = table_dir / f"{field_name}.mask"
+        if mask_file.exists():
+            mask = np.fromfile(mask_file, dtype=np.bool_)
+            if mask.any():
+                return np.ma.masked_array(values, mask=mask)
+        return values
+    
+    def append_record(self, table_name: str, record: Dict[str, Any]):
+        """Append a single record to the end of every column file."""
+        self.append_records(table_name, [record])
+    
+    def append_records(self, table_name: str, records: List[Dict[str, Any]]):
+        """Append a batch of records to the end of every column file."""
+        # Write to WAL first
+        self._wal_pending.extend([
+            self._wal_entry(OperationType.INSERT, table_name, record)
+            for record in records
+        ])
+        self.flush_wal()
+        
+        self._write_columns(table_name, records, 'ab')
+    
+    def compact(self, table_name: str):
+        """Column files are rewritten whole on every save, so there is nothing to compact."""
+    
+    def first_record(self, table_name: str) -> Optional[Dict[str, Any]]:
+        """Read the first record of a table, reassembled from its columns."""
+        return next(self.iter_records(table_name), None)
+    
+    def _remove_data(self, data_file: Path):
+        """Delete a table's column directory."""
+        shutil.rmtree(data_file)
+    
+    def _data_file_stats(self, table_name: str, data_file: Path) -> Tuple[int, int]:
+        """Get the total size of a table's column files and its record count."""
+        size = sum(path.stat().st_size for path in data_file.iterdir())
+        rows_file = data_file / "rows"
+        return size, int(rows_file.read_text()) if rows_file.exists() else 0
@@ -0,0 +1,627 @@
+"""
+Core table storage for the in-memory database.
+Field and Table hold the per-row hot paths (validation, indexing, querying)
+and are kept fully annotated so this module can be compiled with mypyc.
+"""
+
+from typing import Any, Dict, List, Optional, Set, Callable, Tuple, Type, Union
+from collections import namedtuple
+from copy import deepcopy
+from functools import lru_cache
+from types import CodeType
+import ast
+import operator
+import sys
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; columns are then scanned in Python
+    np = None  # type: ignore[assignment]
+
+
+# Field types whose values are immutable, so records can be copied shallowly
+_SCALAR_TYPES = (int, str, float, bool, type(None))
+
+# Comparison operators for structured where clauses, e.g. {'gpa': ('>', 3.5)}
+_OPERATORS = {
+    '==': operator.eq,
+    '!=': operator.ne,
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+}
+_ORDERING_OPERATORS = {'<', '<=', '>', '>='}
+
+# Rough selectivity of each operator, lowest first: equality usually leaves
+# the fewest candidates, so ANDed terms are evaluated in this order
+_OPERATOR_RANK = {'==': 0, '<': 1, '<=': 1, '>': 1, '>=': 1, '!=': 2}
+
+# NumPy dtypes for numeric columns, and the table size from which
+# comparing a whole array at once beats a Python loop
+_NUMERIC_DTYPES = {int: 'int64', float: 'float64', bool: 'bool'}
+# Value types a numeric column may hold to be converted without changing any
+# comparison (a coerced 3.5 in an int column would be truncated to 3)
+_ARRAY_VALUE_TYPES: Dict[type, Set[type]] = {int: {int}, float: {int, float}, bool: {bool}}
+_VECTORIZE_MIN_ROWS = 64
+
+# A single (field, operator, value) comparison
+Term = Tuple[str, str, Any]
+
+
+class Condition:
+    """
+    An inspectable where clause built from Col comparisons.
+    
+    Terms are ANDed together. Unlike a lambda, the table can see which fields
+    are compared, so equality on a unique or primary key field is answered
+    from its hash index instead of a scan.
+    """
+    __slots__ = ('terms',)
+    
+    def __init__(self, terms: Tuple[Term, ...]):
+        self.terms = terms
+    
+    def __and__(self, other: 'Condition') -> 'Condition':
+        return Condition(self.terms + other.terms)
+    
+    def __bool__(self) -> bool:
+        raise TypeError("Combine conditions with & instead of 'and'")
+    
+    def __repr__(self) -> str:
+        return ' & '.join(f"(Col({f!r}) {op} {v!r})" for f, op, v in self.terms)
+
+
+class Col:
+    """A field reference for building where clauses, e.g. Col('name') == 'Alice'."""
+    __slots__ = ('name',)
+    
+    def __init__(self, name: str):
+        self.name = name
+    
+    def __eq__(self, value: Any) -> Condition:  # type: ignore[override]
+        return Condition(((self.name, '==', value),))
+    
+    def __ne__(self, value: Any) -> Condition:  # type: ignore[override]
+        return Condition(((self.name, '!=', value),))
+    
+    def __lt__(self, value: Any) -> Condition:
+        return Condition(((self.name, '<', value),))
+    
+    def __le__(self, value: Any) -> Condition:
+        return Condition(((self.name, '<=', value),))
+    
+    def __gt__(self, value: Any) -> Condition:
+        return Condition(((self.name, '>', value),))
+    
+    def __ge__(self, value: Any) -> Condition:
+        return Condition(((self.name, '>=', value),))
+
+
+# A where clause is a predicate over a record, a Col condition such as
+# (Col('gpa') > 3.5) & (Col('age') < 22), a structured
+# {field: (operator, value)} dict whose conditions are ANDed together,
+# or a Python expression string over field names like "gpa > 3.5"
+WhereClause = Union[Callable[[Dict[str, Any]], bool], Condition, Dict[str, Tuple[str, Any]], str]
+
+# Globals for evaluating where expressions: field names are the only names
+_WHERE_GLOBALS: Dict[str, Any] = {'__builtins__': {}}
+
+
+@lru_cache(maxsize=256)
+def _compile_where(expression: str) -> CodeType:
+    """
+    Compile a where expression once so repeated queries reuse the code object.
+    
+    Records are evaluated as the expression's locals, so assignment
+    expressions (:=) are rejected; they would write into the stored rows.
+    """
+    tree = ast.parse(expression, '<where>', 'eval')
+    if any(isinstance(node, ast.NamedExpr) for node in ast.walk(tree)):
+        raise ValueError(f"Invalid where expression {expression!r}: assignments are not allowed")
+    return compile(tree, '<where>', 'eval')
+
+
+class Field:
+    """Represents a field in a table with type and constraints."""
+    __slots__ = ('field_type', 'primary_key', 'nullable', 'unique')
+    
+    def __init__(self, field_type: Type, primary_key: bool = False, nullable: bool = True, unique: bool = False):
+        self.field_type = field_type
+        self.primary_key = primary_key
+        self.nullable = nullable
+        self.unique = unique
+    
+    def validate(self, value: Any) -> bool:
+        """Validate a value against field constraints."""
+        if value is None:
+            return self.nullable
+        
+        # Fast path: an exact type match needs no MRO walk or coercion attempt
+        if type(value) is self.field_type:
+            return True
+        
+        # Type checking
+        if not isinstance(value, self.field_type):
+            try:
+                # Try to coerce the type
+                self.field_type(value)
+            except (ValueError, TypeError):
+                return False
+        
+        return True
+
+
+class Table:
+    """
+    Represents a table in the database with schema and data.
+    
+    With defensive_copy=False, insert() stores the record dict it is given
+    instead of a copy, so the caller must not modify it afterwards. The
+    @table decorator uses this, since its keyword arguments are a fresh dict.
+    """
+    def __init__(self, name: str, schema: Dict[str, Field], defensive_copy: bool = True):
+        self.name: str = name
+        self.schema: Dict[str, Field] = schema
+        self.defensive_copy: bool = defensive_copy
+        self.data: List[Dict[str, Any]] = []
+        self.primary_key_field: Optional[str] = next(
+            (name for name, field in schema.items() if field.primary_key), None
+        )
+        self._next_id: int = 1
+        
+        # Fields that must be provided on insert (the primary key is generated)
+        self._required_fields: frozenset = frozenset(
+            name for name, field in schema.items()
+            if not field.nullable and name != self.primary_key_field
+        )
+        
+        # Records of scalar-only schemas are flat, so dict() is a full copy
+        self._flat: bool = all(field.field_type in _SCALAR_TYPES for field in schema.values())
+        
+        # String fields whose values are interned, so repeated values such as
+        # a major or semester share one object and compare by identity first
+        self._str_fields: Tuple[str, ...] = tuple(
+            name for name, field in schema.items() if field.field_type is str
+        )
+        
+        # Lightweight read-only row type for select(as_tuple=True)
+        self._field_names: Tuple[str, ...] = tuple(schema)
+        self._row_type: Any = namedtuple('Row', self._field_names, rename=True)  # type: ignore[misc]
+        
+        # Hash indexes for unique and primary key fields: value -> record
+        self._unique_indexes: Dict[str, Dict[Any, Dict[str, Any]]] = {
+            name: {} for name, field in schema.items() if field.unique or field.primary_key
+        }
+        
+        # Column-oriented copies of field values, built lazily for structured
+        # where clauses and kept aligned with self.data
+        self._columns: Dict[str, List[Any]] = {}
+        # NumPy arrays of numeric columns (None when a column can't be vectorized)
+        self._arrays: Dict[str, Any] = {}
+        # Rows sorted by an order_by key such as 'gpa' or '-gpa', built lazily
+        self._sort_orders: Dict[str, List[Dict[str, Any]]] = {}
+        
+        # Whether rows are stored in ascending primary key order, which holds
+        # for auto-generated ids until a key is inserted out of order or updated
+        self._pk_in_order: bool = True
+        self._last_pk: Optional[int] = None
+    
+    def _copy_record(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """Copy a record, deep-copying only if the schema has non-scalar types."""
+        return dict(record) if self._flat else deepcopy(record)
+    
+    def _to_row(self, record: Dict[str, Any]) -> Tuple[Any, ...]:
+        """Convert a stored record to a named tuple in schema field order."""
+        if not self._flat:
+            record = deepcopy(record)
+        return self._row_type._make(map(record.get, self._field_names))
+    
+    def _intern_strings(self, record: Dict[str, Any]) -> None:
+        """Replace a record's string field values with their interned copies."""
+        for field_name in self._str_fields:
+            value = record.get(field_name)
+            if type(value) is str:
+                record[field_name] = sys.intern(value)
+    
+    def _index_add(self, record: Dict[str, Any]) -> None:
+        """Add a record's unique values to the hash indexes."""
+        for field_name, index in self._unique_indexes.items():
+            value = record.get(field_name)
+            if value is not None:
+                index[value] = record
+    
+    def _index_remove(self, record: Dict[str, Any]) -> None:
+        """Remove a record's unique values from the hash indexes."""
+        for field_name, index in self._unique_indexes.items():
+            value = record.get(field_name)
+            if value is not None and index.get(value) is record:
+                del index[value]
+    
+    def _clear_caches(self) -> None:
+        """Drop cached columns, arrays and sort orders after rows change."""
+        self._columns.clear()
+        self._arrays.clear()
+        self._sort_orders.clear()
+    
+    def _track_pk_order(self, record: Dict[str, Any]) -> None:
+        """Note a newly appended record's primary key for order_by shortcuts."""
+        if not self._pk_in_order or not self.primary_key_field:
+            return
+        pk_value = record[self.primary_key_field]
+        if type(pk_value) is int and (self._last_pk is None or pk_value > self._last_pk):
+            self._last_pk = pk_value
+        else:
+            self._pk_in_order = False
+    
+    def _rebuild_indexes(self) -> None:
+        """Rebuild all hash indexes and drop cached data after data is replaced."""
+        self._clear_caches()
+        for index in self._unique_indexes.values():
+            index.clear()
+        self._pk_in_order = True
+        self._last_pk = None
+        for record in self.data:
+            self._intern_strings(record)
+            self._index_add(record)
+            self._track_pk_order(record)
+    
+    def _column(self, field_name: str) -> List[Any]:
+        """Get the values of one field across all rows, in row order."""
+        column = self._columns.get(field_name)
+        if column is None:
+            column = [r.get(field_name) for r in self.data]
+            self._columns[field_name] = column
+        return column
+    
+    def _array(self, field_name: str) -> Optional[Any]:
+        """
+        Get a numeric column as a NumPy array.
+        
+        Returns None when NumPy is unavailable, the field isn't numeric, or the
+        column holds values NumPy would compare differently (NULLs, coerced
+        strings, floats in an int column).
+        """
+        field_type = self.schema[field_name].field_type
+        dtype = _NUMERIC_DTYPES.get(field_type)
+        if np is None or dtype is None:
+            return None
+        
+        if field_name not in self._arrays:
+            column = self._column(field_name)
+            value_types = _ARRAY_VALUE_TYPES[field_type]
+            array = None
+            if all(type(v) in value_types for v in column):
+                try:
+                    array = np.array(column, dtype=dtype)
+                except OverflowError:
+                    pass
+            self._arrays[field_name] = array
+        return self._arrays[field_name]
+    
+    def _check_terms(self, terms: Tuple[Term, ...]) -> None:
+        """Reject comparisons on unknown fields or with unknown operators."""
+        for field_name, op, _ in terms:
+            if field_name not in self.schema:
+                raise ValueError(f"Unknown field: {field_name}")
+            if op not in _OPERATORS:
+                raise ValueError(f"Unknown operator: {op}")
+    
+    def _probe_unique(self, terms: Tuple[Term, ...]) -> Optional[List[Dict[str, Any]]]:
+        """
+        Answer terms from a hash index if one is an equality on a unique field.
+        
+        Returns None when no term can use an index.
+        """
+        for i, (field_name, op, value) in enumerate(terms):
+            index = self._unique_indexes.get(field_name)
+            # NULLs aren't indexed, so == None still needs a scan
+            if op != '==' or index is None or value is None:
+                continue
+            
+            record = index.get(value)
+            if record is None:
+                return []
+            for other_field, other_op, other_value in terms[:i] + terms[i + 1:]:
+                current: Any = record.get(other_field)
+                if current is None and other_op in _ORDERING_OPERATORS:
+                    return []
+                if not _OPERATORS[other_op](current, other_value):
+                    return []
+            return [record]
+        return None
+    
+    def _filter_indices(self, terms: Tuple[Term, ...]) -> List[int]:
+        """
+        Evaluate (field, operator, value) terms one column at a time.
+        
+        Terms are applied most selective first, so later columns are only
+        compared at the rows that survived earlier ones.
+        """
+        indices: Optional[List[int]] = None
+        for field_name, op, value in sorted(terms, key=lambda term: _OPERATOR_RANK[term[1]]):
+            compare = _OPERATORS[op]
+            if type(value) is str:
+                value = sys.intern(value)
+            
+            # Compare the whole column in one vectorized operation when possible
+            array = None
+            if len(self.data) >= _VECTORIZE_MIN_ROWS and type(value) in _NUMERIC_DTYPES:
+                array = self._array(field_name)
+            if array is not None:
+                if indices is None:
+                    indices = np.flatnonzero(compare(array, value)).tolist()
+                else:
+                    candidates = np.array(indices, dtype='int64')
+                    indices = candidates[compare(array[candidates], value)].tolist()
+                continue
+            
+            column = self._column(field_name)
+            # NULLs never satisfy an ordering comparison
+            skip_none = op in _ORDERING_OPERATORS
+            
+            if indices is None:
+                indices = [i for i, v in enumerate(column)
+                           if not (skip_none and v is None) and compare(v, value)]
+            else:
+                indices = [i for i in indices
+                           if not (skip_none and column[i] is None) and compare(column[i], value)]
+        
+        return list(range(len(self.data))) if indices is None else indices
+    
+    def _is_pk_order(self, order_by: str) -> bool:
+        """Check whether stored row order already satisfies an order_by on the primary key."""
+        return self._pk_in_order and order_by.lstrip('-') == self.primary_key_field
+    
+    def _sorted(self, order_by: str) -> List[Dict[str, Any]]:
+        """Get all rows ordered by a field ('-' prefix for descending), cached until the next write."""
+        if self._is_pk_order(order_by):
+            return self.data[::-1] if order_by.startswith('-') else self.data
+        
+        order = self._sort_orders.get(order_by)
+        if order is None:
+            reverse = order_by.startswith('-')
+            field_name = order_by[1:] if reverse else order_by
+            order = sorted(self.data, key=lambda x: x.get(field_name, ''), reverse=reverse)
+            self._sort_orders[order_by] = order
+        return order
+    
+    def _find(self, where: Optional[WhereClause]) -> List[Dict[str, Any]]:
+        """Get the stored records matching a where clause."""
+        if where is None:
+            return list(self.data)
+        if isinstance(where, (Condition, dict)):
+            if isinstance(where, Condition):
+                terms = where.terms
+            else:
+                terms = tuple((f, op, v) for f, (op, v) in where.items())
+            self._check_terms(terms)
+            matches = self._probe_unique(terms)
+            if matches is not None:
+                return matches
+            return [self.data[i] for i in self._filter_indices(terms)]
+        if isinstance(where, str):
+            # Expressions are evaluated as Python, so only pass trusted strings
+            code = _compile_where(where)
+            try:
+                return [r for r in self.data if eval(code, _WHERE_GLOBALS, r)]
+            except NameError as e:
+                raise ValueError(f"Invalid where expression {where!r}: {e}") from e
+        return [r for r in self.data if where(r)]
+    
+    def _is_duplicate(self, field_name: str, value: Any,
+                      current: Optional[Dict[str, Any]] = None) -> bool:
+        """Check whether another record (not `current`) already holds a unique value."""
+        index = self._unique_indexes.get(field_name)
+        if index is None or value is None:
+            return False
+        existing = index.get(value)
+        return existing is not None and existing is not current
+    
+    def _validate_record(self, record: Dict[str, Any]) -> tuple[bool, Optional[str]]:
+        """Validate a record against the table schema."""
+        # Check all schema fields are present
+        for field_name in self._field_names:
+            if field_name not in record:
+                if field_name in self._required_fields:
+                    return False, f"Missing required field: {field_name}"
+                record[field_name] = None
+        
+        # Validate each field
+        for field_name, value in record.items():
+            if field_name not in self.schema:
+                return False, f"Unknown field: {field_name}"
+            
+            field_def = self.schema[field_name]
+            if not field_def.validate(value):
+                return False, f"Invalid value for field {field_name}: {value}"
+            
+            # Check unique constraint
+            if self._is_duplicate(field_name, value):
+                return False, f"Duplicate value for unique field {field_name}: {value}"
+        
+        return True, None
+    
+    def _validate_updates(self, updates: Dict[str, Any]) -> tuple[bool, Optional[str]]:
+        """
+        Validate the fields being updated.
+        
+        Untouched fields were validated when the record was inserted, and the
+        type checks don't depend on the row, so this runs once per update call.
+        """
+        for field_name, value in updates.items():
+            if field_name not in self.schema:
+                return False, f"Unknown field: {field_name}"
+            if not self.schema[field_name].validate(value):
+                return False, f"Invalid value for field {field_name}: {value}"
+        return True, None
+    
+    def insert(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """Insert a record into the table."""
+        if self.defensive_copy:
+            record = self._copy_record(record)
+        pk_field = self.primary_key_field
+        
+        # Auto-generate primary key if needed
+        if pk_field is not None and pk_field not in record:
+            record[pk_field] = self._next_id
+            self._next_id += 1
+        
+        # Validate record
+        valid, error = self._validate_record(record)
+        if not valid:
+            raise ValueError(f"Invalid record: {error}")
+        
+        # Keep auto-generated ids clear of explicitly provided ones
+        if pk_field is not None:
+            pk_value = record[pk_field]
+            if isinstance(pk_value, int) and pk_value >= self._next_id:
+                self._next_id = pk_value + 1
+        
+        self._intern_strings(record)
+        self.data.append(record)
+        self._index_add(record)
+        self._track_pk_order(record)
+        for field_name, column in self._columns.items():
+            column.append(record[field_name])
+        self._arrays.clear()
+        self._sort_orders.clear()
+        return record
+    
+    def insert_many(self, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Insert a batch of records into the table.
+        
+        The whole batch is validated before anything is stored, so either
+        every record is inserted or none are.
+        """
+        batch = [self._copy_record(r) for r in records]
+        
+        # Auto-generate primary keys for the batch
+        next_id = self._next_id
+        if self.primary_key_field:
+            for record in batch:
+                if self.primary_key_field not in record:
+                    record[self.primary_key_field] = next_id
+                    next_id += 1
+        
+        # Validate against stored rows and against the rest of the batch
+        seen: Dict[str, Set[Any]] = {field_name: set() for field_name in self._unique_indexes}
+        for record in batch:
+            valid, error = self._validate_record(record)
+            if not valid:
+                raise ValueError(f"Invalid record: {error}")
+            
+            for field_name, values in seen.items():
+                value = record[field_name]
+                if value is None:
+                    continue
+                if value in values:
+                    raise ValueError(
+                        f"Invalid record: Duplicate value for unique field {field_name}: {value}"
+                    )
+                values.add(value)
+        
+        # Keep auto-generated ids clear of explicitly provided ones
+        if self.primary_key_field:
+            for record in batch:
+                pk_value = record[self.primary_key_field]
+                if isinstance(pk_value, int) and pk_value >= next_id:
+                    next_id = pk_value + 1
+        self._next_id = next_id
+        
+        self.data.extend(batch)
+        for record in batch:
+            self._intern_strings(record)
+            self._index_add(record)
+            self._track_pk_order(record)
+        for field_name, column in self._columns.items():
+            column.extend(record[field_name] for record in batch)
+        self._arrays.clear()
+        self._sort_orders.clear()
+        return batch
+    
+    def select(self, where: Optional[WhereClause] = None, 
+               order_by: Optional[str] = None,
+               limit: Optional[int] = None,
+               as_tuple: bool = False) -> Union[List[Dict[str, Any]], List[Tuple[Any, ...]]]:
+        """
+        Query records from the table.
+        
+        With as_tuple=True, rows are returned as named tuples (row.gpa), which
+        are smaller and cheaper to build than dict copies.
+        """
+        if order_by and where is None:
+            # Unfiltered ordered queries reuse the cached sort order
+            results = self._sorted(order_by)
+        else:
+            results = self._find(where)
+            if order_by and self._is_pk_order(order_by):
+                # Matches keep row order, which is already primary key order
+                if order_by.startswith('-'):
+                    results.reverse()
+            elif order_by:
+                reverse = False
+                if order_by.startswith('-'):
+                    reverse = True
+                    order_by = order_by[1:]
+                results = sorted(results, key=lambda x: x.get(order_by, ''), reverse=reverse)
+        
+        if limit is not None:
+            results = results[:limit]
+        
+        if as_tuple:
+            return [self._to_row(r) for r in results]
+        return [self._copy_record(r) for r in results]
+    
+    def update(self, where: WhereClause, 
+               updates: Dict[str, Any]) -> int:
+        """Update records matching the where clause."""
+        matches = self._find(where)
+        if not matches:
+            return 0
+        
+        # Validate updates
+        valid, error = self._validate_updates(updates)
+        if not valid:
+            raise ValueError(f"Invalid update: {error}")
+        
+        updates = dict(updates)
+        self._intern_strings(updates)
+        unique_updates = [(f, v) for f, v in updates.items() if f in self._unique_indexes]
+        self._clear_caches()
+        if self.primary_key_field in updates:
+            self._pk_in_order = False
+        
+        count = 0
+        for record in matches:
+            for field_name, value in unique_updates:
+                if self._is_duplicate(field_name, value, current=record):
+                    raise ValueError(
+                        f"Invalid update: Duplicate value for unique field {field_name}: {value}"
+                    )
+            
+            self._index_remove(record)
+            record.update(updates)
+            self._index_add(record)
+            count += 1
+        
+        return count
+    
+    def delete(self, where: WhereClause) -> int:
+        """Delete records matching the where clause."""
+        to_delete = self._find(where)
+        if not to_delete:
+            return 0
+        
+        # Rebuild the row list in one pass instead of list.remove per record
+        deleted_ids = {id(record) for record in to_delete}
+        self.data[:] = [r for r in self.data if id(r) not in deleted_ids]
+        for record in to_delete:
+            self._index_remove(record)
+        self._clear_caches()
+        return len(to_delete)
+    
+    def count(self) -> int:
+        """Return the number of records in the table."""
+        return len(self.data)
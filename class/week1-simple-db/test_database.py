@@ -3,7 +3,7 @@ Test and demonstration of database features and edge cases.
 """
 
 from dataclasses import dataclass, field
-from database import table, get_db, Database
+from database import table, get_db, Database, Col
 
 
 def test_basic_operations():
@@ -37,16 +37,16 @@ def test_basic_operations():
     
     # UPDATE
     print("\n✓ Updating John's age to 31...")
-    updated = Person.update(where=lambda p: p['name'] == 'John', age=31)
+    updated = Person.update(where=Col('name') == 'John', age=31)
     print(f"  Updated {updated} record(s)")
     
     # Verify update
-    john = Person.select(where=lambda p: p['name'] == 'John')[0]
+    john = Person.select(where=Col('name') == 'John')[0]
     print(f"  John's new age: {john['age']}")
     
     # DELETE
     print("\n✓ Deleting Bob...")
-    deleted = Person.delete(where=lambda p: p['name'] == 'Bob')
+    deleted = Person.delete(where=Col('name') == 'Bob')
     print(f"  Deleted {deleted} record(s)")
     print(f"  Remaining records: {Person.count()}")
     
@@ -82,6 +82,39 @@ def test_constraints():
     except ValueError as e:
         print(f"  ✓ Correctly rejected: {e}")
     
+    # Test unique constraint on update
+    print("\n✓ Testing unique constraint on update...")
+    User.insert(username="bob", email="bob@example.com", age=22)
+    try:
+        User.update(where=Col('username') == 'bob', username="alice")
+        print("  ❌ Should have failed!")
+    except ValueError as e:
+        print(f"  ✓ Correctly rejected: {e}")
+    assert User.update(where=Col('username') == 'bob', email="bob@example.com") == 1
+    print("  Re-saving a record's own unique value is allowed")
+    
+    # Test unique constraint within a batch
+    print("\n✓ Testing unique constraint within a batch insert...")
+    before = User.count()
+    try:
+        User.insert_many([
+            {"username": "carol", "email": "carol@example.com"},
+            {"username": "carol", "email": "carol2@example.com"},
+        ])
+        print("  ❌ Should have failed!")
+    except ValueError as e:
+        print(f"  ✓ Correctly rejected: {e}")
+    assert User.count() == before, "A rejected batch should insert nothing"
+    
+    # Unique values are looked up through a hash index kept in step with writes
+    print("\n✓ Testing unique index maintenance...")
+    assert User.select(where=Col('username') == 'alice')[0]['email'] == "alice@example.com"
+    User.update(where=Col('username') == 'bob', username="robert")
+    assert User.select(where=Col('username') == 'bob') == []
+    User.delete(where=Col('username') == 'robert')
+    User.insert(username="robert", email="robert@example.com")
+    print("  Updated and deleted values are free to reuse")
+    
     # Test nullable constraint
     print("\n✓ Testing nullable constraint...")
     try:
@@ -120,8 +153,7 @@ def test_complex_queries():
         {"name": "Lamp", "category": "Furniture", "price": 49.99, "in_stock": False},
     ]
     
-    for p in products:
-        Product.insert(**p)
+    Product.insert_many(products)
     
     print(f"✓ Inserted {len(products)} products\n")
     
@@ -133,6 +165,40 @@ def test_complex_queries():
     for r in results:
         print(f"  - {r['name']}: ${r['price']}")
     
+    # Query 1b: Same filter as a structured where clause
+    print("\nQuery 1b: Electronics under $500 (structured where)")
+    structured = Product.select(
+        where={'category': ('==', 'Electronics'), 'price': ('<', 500)}
+    )
+    assert structured == results, "Structured where should match the lambda query"
+    for r in structured:
+        print(f"  - {r['name']}: ${r['price']}")
+    
+    # Query 1c: Same filter as a where expression string
+    print("\nQuery 1c: Electronics under $500 (where expression)")
+    expression = Product.select(where="category == 'Electronics' and price < 500")
+    assert expression == results, "Where expression should match the lambda query"
+    for r in expression:
+        print(f"  - {r['name']}: ${r['price']}")
+    
+    # Expressions can't assign to fields of the stored records
+    try:
+        Product.select(where="(price := 0) or True")
+        print("  ❌ Should have failed!")
+    except ValueError as e:
+        print(f"  ✓ Correctly rejected: {e}")
+    assert min(r['price'] for r in Product.select()) == 29.99
+    
+    # Query 1d: Same filter as Col conditions, written range first; the
+    # table evaluates the equality on category before the price range
+    print("\nQuery 1d: Electronics under $500 (Col conditions)")
+    conditions = Product.select(
+        where=(Col('price') < 500) & (Col('category') == 'Electronics')
+    )
+    assert conditions == results, "Col conditions should match the lambda query"
+    for r in conditions:
+        print(f"  - {r['name']}: ${r['price']}")
+    
     # Query 2: Out of stock items
     print("\nQuery 2: Out of stock items")
     results = Product.select(where=lambda p: not p['in_stock'])
@@ -142,7 +208,7 @@ def test_complex_queries():
     # Query 3: Furniture sorted by price
     print("\nQuery 3: Furniture sorted by price (ascending)")
     results = Product.select(
-        where=lambda p: p['category'] == 'Furniture',
+        where=Col('category') == 'Furniture',
         order_by='price'
     )
     for r in results:
@@ -154,6 +220,9 @@ def test_complex_queries():
     for r in results:
         print(f"  - {r['name']}: ${r['price']}")
     
+    rows = Product.select(order_by='-price', limit=2, as_tuple=True)
+    assert [row.name for row in rows] == [r['name'] for r in results]
+    
     print("\n✅ Test 3 passed!\n")
 
 
@@ -195,7 +264,7 @@ def test_multiple_tables():
     
     # Manual "join" - find all books by George Orwell
     print("Query: Books by George Orwell")
-    orwell = Author.select(where=lambda a: a['name'] == 'George Orwell')[0]
+    orwell = Author.select(where=Col('name') == 'George Orwell')[0]
     orwell_books = Book.select(where=lambda b: b['author_id'] == orwell['id'])
     
     for book in orwell_books:
@@ -207,7 +276,7 @@ def test_multiple_tables():
     author_ids = set(b['author_id'] for b in old_books)
     
     for author_id in author_ids:
-        author = Author.select(where=lambda a: a['id'] == author_id)[0]
+        author = Author.select(where=Col('id') == author_id)[0]
         print(f"  - {author['name']} ({author['country']})")
     
     print("\n✅ Test 4 passed!\n")
@@ -258,9 +327,66 @@ def test_edge_cases():
     assert len(results) == 1
     print("  Limit handled correctly")
     
+    # Ordered query after a write sees the new row
+    print("\n✓ Testing ordered query after insert...")
+    assert Item.select(order_by='-value', limit=1)[0]['name'] == "First"
+    Item.insert(name="Second", value=500)
+    assert Item.select(order_by='-value', limit=1)[0]['name'] == "Second"
+    print("  Ordering reflects the latest data")
+    
+    # Dropped table is no longer reachable through the class
+    print("\n✓ Testing class access after drop_table...")
+    test_db.drop_table("item")
+    try:
+        Item.count()
+        print("  ❌ Should have failed!")
+    except ValueError as e:
+        print(f"  ✓ Correctly rejected: {e}")
+
     print("\n✅ Test 5 passed!\n")
 
 
+def test_large_table_queries():
+    """Test that column-at-a-time queries on larger tables match lambdas."""
+    print("=" * 80)
+    print("TEST 6: Large Table Queries")
+    print("=" * 80 + "\n")
+    
+    test_db = Database("test_large")
+    
+    @table(db=test_db)
+    @dataclass
+    class Reading:
+        id: int = field(metadata={'primary_key': True})
+        sensor: str = field(metadata={'nullable': False})
+        level: int = field(metadata={'nullable': False})
+        value: float = field(metadata={'nullable': False})
+    
+    # Enough rows for numeric columns to be compared as NumPy arrays
+    Reading.insert_many([
+        {"sensor": f"s{i % 4}", "level": i % 10, "value": i / 2 if i % 3 else i}
+        for i in range(100)
+    ])
+    print(f"✓ Inserted {Reading.count()} readings\n")
+    
+    print("✓ Comparing numeric range queries...")
+    expected = Reading.select(where=lambda r: r['level'] >= 7 and r['value'] < 30)
+    assert Reading.select(where={'level': ('>=', 7), 'value': ('<', 30)}) == expected
+    assert Reading.select(where=(Col('level') >= 7) & (Col('value') < 30)) == expected
+    print(f"  {len(expected)} rows match in every form")
+    
+    # A float accepted into an int field must not be truncated for comparison
+    print("\n✓ Comparing queries over a coerced value...")
+    Reading.insert(sensor="s9", level=3.5, value=1.0)
+    expected = Reading.select(where=lambda r: r['level'] == 3)
+    assert Reading.select(where={'level': ('==', 3)}) == expected
+    assert Reading.select(where=Col('level') == 3) == expected
+    assert Reading.select(where=Col('level') == 3.5)[0]['sensor'] == "s9"
+    print(f"  {len(expected)} rows match level == 3 in every form")
+    
+    print("\n✅ Test 6 passed!\n")
+
+
 def main():
     """Run all tests."""
     print("\n" + "=" * 80)
@@ -272,6 +398,7 @@ def main():
     test_complex_queries()
     test_multiple_tables()
     test_edge_cases()
+    test_large_table_queries()
     
     print("=" * 80)
     print("✅ ALL TESTS PASSED!")
@@ -3,18 +3,35 @@ Test suite for database persistence layer.
 """
 
 from dataclasses import dataclass, field
-from database import Database, table
+from database import Database, table, Col
+from datetime import datetime, timedelta
 from pathlib import Path
+import persistence
 import shutil
+import importlib.util
+import tempfile
 import json
+import math
+import sys
+import threading
+
+
+# Test databases live in a scratch directory (usually tmpfs), never ./data
+TEST_DIR = tempfile.TemporaryDirectory(prefix="test_persistence_")
+DATA_PATH = Path(TEST_DIR.name)
+
+
+def open_db(db_name):
+    """Open a test database; tests don't need their files fsynced."""
+    return Database(name=db_name, persist=True, base_path=str(DATA_PATH), durability="none")
 
 
 def setup_clean_db(db_name="test_persist"):
     """Create a clean test database."""
-    db_path = Path(f"./data/{db_name}")
+    db_path = DATA_PATH / db_name
     if db_path.exists():
         shutil.rmtree(db_path)
-    return Database(name=db_name, persist=True, base_path="./data")
+    return open_db(db_name)
 
 
 def test_basic_save_load():
@@ -44,10 +61,11 @@ def test_basic_save_load():
     # Save to disk
     print("\n✓ Saving to disk...")
     db.save()
+    db.close()
     
     # Create new instance and load
     print("\n✓ Creating new database instance...")
-    db_new = Database(name="test_basic", persist=True, base_path="./data")
+    db_new = open_db("test_basic")
     
     print("✓ Loading from disk...")
     tables_loaded = db_new.load()
@@ -88,7 +106,7 @@ def test_schema_persistence():
     print("✓ Schema created for Product table")
     
     # Check schema file exists
-    schema_file = Path("./data/test_schema/schema/product.schema.json")
+    schema_file = DATA_PATH / "test_schema" / "schema" / "product.schema.json"
     assert schema_file.exists(), "Schema file should exist"
     
     print("✓ Schema file exists")
@@ -137,14 +155,15 @@ def test_updates_persist():
     print("✓ Session 1: Updating alice's score...")
     user_table = db1.get_table("user")
     user_table.update(
-        where=lambda u: u['username'] == 'alice',
+        where=Col('username') == 'alice',
         updates={'score': 150}
     )
     db1.save()
+    db1.close()
     
     # Session 2: Load and verify
     print("\n✓ Session 2: Loading database...")
-    db2 = Database(name="test_updates", persist=True, base_path="./data")
+    db2 = open_db("test_updates")
     db2.load()
     
     user_table2 = db2.get_table("user")
@@ -189,7 +208,7 @@ def test_multiple_tables():
     
     # Load in new session
     print("\n✓ Loading from disk...")
-    db_new = Database(name="test_multi", persist=True, base_path="./data")
+    db_new = open_db("test_multi")
     tables_loaded = db_new.load()
     
     assert tables_loaded == 2, f"Expected 2 tables, got {tables_loaded}"
@@ -237,6 +256,23 @@ def test_wal_operations():
     op_types = [op['operation'] for op in operations]
     print(f"  Operations: {', '.join(op_types)}")
     
+    # Logged changes must be on disk before save() rewrites the data files
+    print("\n✓ Checking the WAL is written before data files...")
+    wal_file = DATA_PATH / "test_wal" / "wal" / "transaction.log"
+    deleted = Event.select(where=Col('id') == 2)
+    Event.delete(where=Col('id') == 2)
+    db.storage.delete_records("event", deleted)
+    logged_at_save = []
+    real_save_records = db.storage.save_records
+    def checking_save_records(table_name, records):
+        logged_at_save.append(wal_file.read_bytes().count(b'"DELETE"'))
+        real_save_records(table_name, records)
+    db.storage.save_records = checking_save_records
+    db.save()
+    del db.storage.save_records
+    assert logged_at_save == [1], f"DELETE entries in the WAL at save time: {logged_at_save}"
+    print("  DELETE entry logged before the data file was written")
+    
     # Checkpoint
     print("\n✓ Checkpointing WAL...")
     db.checkpoint()
@@ -245,7 +281,7 @@ def test_wal_operations():
     print(f"  WAL entries after checkpoint: {len(operations_after)}")
     
     # Check for archived WAL
-    wal_path = Path("./data/test_wal/wal")
+    wal_path = DATA_PATH / "test_wal" / "wal"
     archived = list(wal_path.glob("transaction.*.log"))
     assert len(archived) > 0, "Should have archived WAL file"
     print(f"  Archived WAL files: {len(archived)}")
@@ -269,8 +305,7 @@ def test_stats():
         value: int
     
     # Insert some data
-    for i in range(10):
-        Item.insert(name=f"Item {i}", value=i * 10)
+    Item.insert_many([{"name": f"Item {i}", "value": i * 10} for i in range(10)])
     
     db.save()
     
@@ -319,7 +354,7 @@ def test_export():
     db.save()
     
     # Export
-    export_path = Path("./exports_test")
+    export_path = DATA_PATH / "exports"
     export_path.mkdir(exist_ok=True)
     export_file = export_path / "customers.json"
     
@@ -361,13 +396,16 @@ def test_json_lines_format():
     
     # Insert records
     print("✓ Inserting records...")
-    for i in range(5):
-        Record.insert(data=f"Record {i}")
+    Record.insert_many([{"data": f"Record {i}"} for i in range(5)])
     
     db.save()
     
+    # Append a batch straight to the data file
+    print("✓ Appending a batch of records...")
+    db.storage.append_records("record", [{"id": 6, "data": "Record 5"}, {"id": 7, "data": "Record 6"}])
+    
     # Read file directly
-    data_file = Path("./data/test_jsonl/data/record.records")
+    data_file = DATA_PATH / "test_jsonl" / "data" / "record.records"
     
     print(f"\n✓ Reading {data_file}...")
     assert data_file.exists(), "Data file should exist"
@@ -384,24 +422,590 @@ def test_json_lines_format():
                 line_count += 1
                 print(f"  Line {line_count}: {record}")
     
-    assert line_count == 5, f"Expected 5 lines, got {line_count}"
+    assert line_count == 7, f"Expected 7 lines, got {line_count}"
+    
+    # Blank lines are skipped, by the preview as well as by full loads
+    print("\n✓ Reading a file that starts with blank lines...")
+    data_file.write_bytes(b"\n  \n" * 3000 + data_file.read_bytes())
+    first = db.storage.first_record("record")
+    assert first == db.storage.load_records("record")[0] == {"id": 1, "data": "Record 0"}, first
+    print(f"  First record: {first}")
     
     print("\n✅ Test 8 passed!\n")
 
 
-def cleanup_test_data():
-    """Clean up all test databases."""
-    print("🗑️  Cleaning up test data...")
-    test_dbs = [
-        "test_basic", "test_schema", "test_updates", "test_multi",
-        "test_wal", "test_stats", "test_export", "test_jsonl"
+def test_special_values():
+    """Test that NaN, infinity and very large ints survive a save and load."""
+    print("=" * 80)
+    print("TEST 9: Special Values")
+    print("=" * 80 + "\n")
+    
+    db = setup_clean_db("test_special")
+    
+    @table(db=db)
+    @dataclass
+    class Measurement:
+        id: int = field(metadata={'primary_key': True})
+        reading: float = field(default=0.0)
+        counter: int = field(default=0)
+    
+    print("✓ Inserting values outside plain JSON numbers...")
+    Measurement.insert(reading=float('nan'), counter=2 ** 70)
+    Measurement.insert(reading=float('inf'), counter=-2 ** 65)
+    Measurement.insert(reading=1.5, counter=7)
+    db.save()
+    db.close()
+    
+    print("✓ Loading in a new session...")
+    db_new = open_db("test_special")
+    db_new.load()
+    records = db_new.get_table("measurement").data
+    
+    assert math.isnan(records[0]['reading']), f"Expected NaN, got {records[0]['reading']}"
+    assert records[0]['counter'] == 2 ** 70
+    assert records[1]['reading'] == float('inf')
+    assert records[1]['counter'] == -2 ** 65
+    assert records[2] == {'id': 3, 'reading': 1.5, 'counter': 7}
+    print(f"  Loaded: {records}")
+    
+    # WAL entries go through the same encoder
+    print("\n✓ Logging an update to the WAL...")
+    old = records[2]
+    new = {**old, 'reading': float('nan'), 'counter': 2 ** 64}
+    db_new.storage.update_records("measurement", [old], [new])
+    entry = db_new.storage.replay_wal()[-1]
+    assert math.isnan(entry['record']['reading'])
+    assert entry['record']['counter'] == 2 ** 64
+    assert entry['old_record'] == old
+    print("  WAL entry read back correctly")
+    db_new.close()
+    
+    print("\n✅ Test 9 passed!\n")
+
+
+def test_durability_modes():
+    """Test that each durability mode fsyncs when it promises to."""
+    print("=" * 80)
+    print("TEST 10: Durability Modes")
+    print("=" * 80 + "\n")
+    
+    # Count fsync calls instead of timing them
+    synced = []
+    real_fsync = persistence.os.fsync
+    persistence.os.fsync = synced.append
+    try:
+        for durability, expect_append, expect_save in [("none", 0, 0), ("batch", 0, 2), ("fsync", 2, 2)]:
+            db_path = DATA_PATH / "test_durability"
+            if db_path.exists():
+                shutil.rmtree(db_path)
+            db = Database(name="test_durability", persist=True, base_path=str(DATA_PATH),
+                          durability=durability)
+            
+            @table(db=db)
+            @dataclass
+            class Entry:
+                id: int = field(metadata={'primary_key': True})
+                text: str
+            
+            # An append writes the WAL and the data file
+            synced.clear()
+            db.storage.append_records("entry", [{"id": 1, "text": "appended"}])
+            appended = len(synced)
+            
+            # Logged deletes are only queued, unless every entry must be fsynced
+            synced.clear()
+            db.storage.delete_records("entry", [{"id": 1, "text": "appended"}])
+            wal_file = db_path / "wal" / "transaction.log"
+            logged = wal_file.read_bytes().count(b'"DELETE"')
+            assert logged == (durability == "fsync"), f"{durability}: {logged} DELETE entries in the WAL"
+            assert len(synced) == logged
+            
+            # A save rewrites the data file from the table and syncs the WAL
+            Entry.insert(text="saved")
+            synced.clear()
+            db.save()
+            saved = len(synced)
+            db.close()
+            
+            print(f"  {durability}: {appended} fsyncs per append, {saved} per save")
+            assert appended == expect_append, f"{durability}: expected {expect_append} fsyncs on append"
+            assert saved == expect_save, f"{durability}: expected {expect_save} fsyncs on save"
+    finally:
+        persistence.os.fsync = real_fsync
+    
+    # Whatever the mode, the data reads back
+    db_new = open_db("test_durability")
+    db_new.load()
+    assert [r['text'] for r in db_new.get_table("entry").data] == ["saved"]
+    db_new.close()
+    
+    try:
+        Database(name="test_durability", persist=True, base_path=str(DATA_PATH),
+                 durability="sometimes")
+        assert False, "Unknown durability mode should be rejected"
+    except ValueError as e:
+        print(f"\n✓ Correctly rejected: {e}")
+    
+    print("\n✅ Test 10 passed!\n")
+
+
+def test_background_checkpoint():
+    """Test checkpoints queued on the background thread."""
+    print("=" * 80)
+    print("TEST 11: Background Checkpoint")
+    print("=" * 80 + "\n")
+    
+    db = setup_clean_db("test_bg_checkpoint")
+    wal_path = DATA_PATH / "test_bg_checkpoint" / "wal"
+    
+    @table(db=db)
+    @dataclass
+    class Task:
+        id: int = field(metadata={'primary_key': True})
+        title: str
+    
+    Task.insert_many([{"title": f"Task {i}"} for i in range(100)])
+    db.save()
+    
+    print("✓ Queuing a checkpoint without waiting...")
+    db.checkpoint(wait=False)
+    db.close()  # Waits for the queued checkpoint
+    
+    archived = list(wal_path.glob("transaction.*.log"))
+    assert len(archived) == 1, f"Expected 1 archived WAL, got {len(archived)}"
+    assert db.storage.replay_wal() == [], "WAL should be empty after the checkpoint"
+    print(f"  Archived {archived[0].name}")
+    
+    # A WAL past the size threshold is archived by the next save, not before
+    print("\n✓ Growing the WAL past the checkpoint threshold...")
+    real_threshold = persistence._CHECKPOINT_THRESHOLD
+    persistence._CHECKPOINT_THRESHOLD = 1
+    try:
+        records = Task.select(limit=persistence._WAL_BATCH_SIZE)
+        db.storage.update_records("task", records, records)
+        db.close()
+        assert len(list(wal_path.glob("transaction.*.log"))) == 1, "No checkpoint before a save"
+        db.save()
+        db.close()
+    finally:
+        persistence._CHECKPOINT_THRESHOLD = real_threshold
+    
+    archived = list(wal_path.glob("transaction.*.log"))
+    assert len(archived) == 2, f"Expected 2 archived WALs, got {len(archived)}"
+    assert db.storage.replay_wal() == [], "WAL should be empty after the checkpoint"
+    print(f"  {len(archived)} archived WAL files")
+    
+    # Entries written while a checkpoint is already running need another one
+    print("\n✓ Checkpointing while a checkpoint is running...")
+    renamed = threading.Event()
+    release = threading.Event()
+    real_archive = db.storage._archive_wal
+    def slow_archive():
+        real_archive()
+        renamed.set()
+        release.wait()
+    db.storage._archive_wal = slow_archive
+    try:
+        db.checkpoint(wait=False)
+        renamed.wait()
+        db.storage.delete_records("task", records[:1])
+        threading.Timer(0.1, release.set).start()
+        db.checkpoint()
+    finally:
+        del db.storage._archive_wal
+    assert db.storage.replay_wal() == [], "The DELETE entry should have been archived"
+    print(f"  {len(list(wal_path.glob('transaction.*.log')))} archived WAL files")
+    db.close()
+    
+    print("\n✓ Loading in a new session...")
+    db_new = open_db("test_bg_checkpoint")
+    db_new.load()
+    assert len(db_new.get_table("task").data) == 100
+    db_new.close()
+    
+    print("\n✅ Test 11 passed!\n")
+
+
+def test_msgpack_format():
+    """Test saving, loading and logging with msgpack data files."""
+    print("=" * 80)
+    print("TEST 12: msgpack Record Format")
+    print("=" * 80 + "\n")
+    
+    if persistence.msgpack is None:
+        print("  msgpack is not installed, skipping")
+        print("\n✅ Test 12 skipped!\n")
+        return
+    
+    db_path = DATA_PATH / "test_msgpack"
+    if db_path.exists():
+        shutil.rmtree(db_path)
+    db = Database(name="test_msgpack", persist=True, base_path=str(DATA_PATH),
+                  durability="none", record_format="msgpack")
+    
+    @table(db=db)
+    @dataclass
+    class Note:
+        id: int = field(metadata={'primary_key': True})
+        text: str
+        score: float = field(default=0.0)
+        pinned: bool = field(default=False)
+    
+    print("✓ Inserting and appending records...")
+    Note.insert_many([
+        {"text": "first", "score": 1.5, "pinned": True},
+        {"text": "zweite — ünïcode", "score": -2.0},
+        {"text": "", "score": 0.0},
+    ])
+    db.save()
+    db.storage.append_records("note", [{"id": 4, "text": "appended", "score": 4.25, "pinned": False}])
+    db.close()
+    
+    raw = (db_path / "data" / "note.records").read_bytes()
+    assert b'"text"' not in raw, "Data file should hold msgpack, not JSON"
+    
+    # The table keeps the format in its schema file, whatever the new engine's default
+    print("✓ Loading in a new session...")
+    db_new = open_db("test_msgpack")
+    db_new.load()
+    notes = db_new.get_table("note").data
+    assert notes == Note.select() + [{"id": 4, "text": "appended", "score": 4.25, "pinned": False}]
+    assert db_new.storage.first_record("note") == notes[0]
+    assert db_new.get_stats()["disk"]["tables"]["note"]["records"] == 4
+    print(f"  Loaded {len(notes)} records")
+    
+    print("\n✓ Replaying the WAL...")
+    inserts = [e for e in db_new.storage.replay_wal() if e['operation'] == 'INSERT']
+    assert [e['record']['text'] for e in inserts] == ["appended"]
+    print(f"  WAL has {len(inserts)} insert entry")
+    db_new.close()
+    
+    print("\n✅ Test 12 passed!\n")
+
+
+def test_columnar_layout():
+    """Test saving, appending and loading with the columnar layout."""
+    print("=" * 80)
+    print("TEST 13: Columnar Layout")
+    print("=" * 80 + "\n")
+    
+    def open_columnar():
+        return Database(name="test_columnar", persist=True, base_path=str(DATA_PATH),
+                        durability="none", layout="columnar")
+    
+    db_path = DATA_PATH / "test_columnar"
+    if db_path.exists():
+        shutil.rmtree(db_path)
+    db = open_columnar()
+    
+    @table(db=db)
+    @dataclass
+    class Sample:
+        id: int = field(metadata={'primary_key': True})
+        label: str
+        count: int = field(default=0)
+        weight: float = field(default=None)
+        valid: bool = field(default=True)
+    
+    # Coerced values are stored as their field's type
+    print("✓ Saving records, including nulls and coerced values...")
+    Sample.insert_many([
+        {"label": "a", "count": 3, "weight": 1.5, "valid": True},
+        {"label": "b", "count": 4, "weight": None, "valid": False},
+        {"label": 123, "count": 5.0, "weight": 2, "valid": True},
+    ])
+    db.save()
+    db.storage.append_records("sample", [{"id": 4, "label": "d", "count": 6, "weight": 0.25, "valid": False}])
+    db.close()
+    
+    print("✓ Loading in a new session...")
+    db_new = open_columnar()
+    db_new.load()
+    samples = db_new.get_table("sample").data
+    assert samples == [
+        {"id": 1, "label": "a", "count": 3, "weight": 1.5, "valid": True},
+        {"id": 2, "label": "b", "count": 4, "weight": None, "valid": False},
+        {"id": 3, "label": "123", "count": 5, "weight": 2.0, "valid": True},
+        {"id": 4, "label": "d", "count": 6, "weight": 0.25, "valid": False},
+    ], f"Unexpected records: {samples}"
+    print(f"  Loaded {len(samples)} records")
+    
+    print("\n✓ Loading single columns...")
+    counts = db_new.storage.load_column("sample", "count")
+    weights = db_new.storage.load_column("sample", "weight")
+    labels = db_new.storage.load_column("sample", "label")
+    assert list(counts) == [3, 4, 5, 6]
+    assert labels == ["a", "b", "123", "d"]
+    if persistence.np is not None:
+        assert weights.mask.tolist() == [False, True, False, False]
+        assert weights.sum() == 3.75
+    else:
+        assert weights == [1.5, None, 2.0, 0.25]
+    print(f"  Read {len(labels)} values from each column")
+    
+    # Values that can't be stored as they are must not leave the columns out of step
+    table_dir = db_path / "data" / "sample"
+    before = {path.name: path.read_bytes() for path in table_dir.iterdir()}
+    sample_table = db_new.get_table("sample")
+    for description, record, error in [
+        ("an int too large for int64", {"label": "e", "count": 2 ** 70}, OverflowError),
+        ("a fractional int", {"label": "e", "count": 3.5}, ValueError),
+        ("a non-bool bool", {"label": "e", "valid": "false"}, ValueError),
+    ]:
+        print(f"\n✓ Saving {description}...")
+        stored = sample_table.insert(record)
+        try:
+            db_new.save()
+            assert False, f"Saving {description} should fail"
+        except error as e:
+            print(f"  ✓ Correctly rejected: {e}")
+        sample_table.delete(where=Col('id') == stored['id'])
+        after = {path.name: path.read_bytes() for path in table_dir.iterdir()}
+        assert after == before, "A failed save should leave the column files unchanged"
+    assert len(db_new.storage.load_records("sample")) == 4
+    db_new.close()
+    
+    print("\n✅ Test 13 passed!\n")
+
+
+def test_incremental_replay():
+    """Test that repeated WAL replays only parse newly appended entries."""
+    print("=" * 80)
+    print("TEST 14: Incremental WAL Replay")
+    print("=" * 80 + "\n")
+    
+    db = setup_clean_db("test_replay")
+    
+    @table(db=db)
+    @dataclass
+    class Log:
+        id: int = field(metadata={'primary_key': True})
+        message: str
+    
+    # Count the entries each replay parses
+    parsed = []
+    real_loads = persistence._loads
+    def counting_loads(data):
+        parsed.append(data)
+        return real_loads(data)
+    persistence._loads = counting_loads
+    try:
+        print("✓ Appending and replaying...")
+        db.storage.append_records("log", [{"id": i, "message": f"m{i}"} for i in range(1, 4)])
+        first = db.storage.replay_wal()
+        assert len(first) == 4, f"Expected CREATE_TABLE and 3 inserts, got {len(first)}"
+        assert len(parsed) == 4
+        
+        print("✓ Appending more and replaying again...")
+        parsed.clear()
+        db.storage.append_records("log", [{"id": i, "message": f"m{i}"} for i in range(4, 6)])
+        second = db.storage.replay_wal()
+        assert second[:4] == first, "Earlier entries should be kept as they were"
+        assert [e['record']['id'] for e in second[4:]] == [4, 5]
+        assert len(parsed) == 2, f"Only the 2 new entries should be parsed, got {len(parsed)}"
+        print(f"  Second replay parsed {len(parsed)} of {len(second)} entries")
+        
+        # A partly written entry is left for the next replay
+        print("\n✓ Replaying with a partly written entry...")
+        parsed.clear()
+        wal_file = DATA_PATH / "test_replay" / "wal" / "transaction.log"
+        with open(wal_file, 'ab') as f:
+            f.write(b'{"operation": "DELETE"')
+        assert db.storage.replay_wal() == second
+        assert parsed == []
+        print("  Incomplete entry skipped")
+    finally:
+        persistence._loads = real_loads
+    
+    # After a checkpoint the replay starts over on the fresh log
+    db.checkpoint()
+    assert db.storage.replay_wal() == []
+    db.close()
+    
+    print("\n✅ Test 14 passed!\n")
+
+
+def test_generated_encoder():
+    """Test the schema-specific JSON Lines encoder used without orjson."""
+    print("=" * 80)
+    print("TEST 15: Generated Record Encoder")
+    print("=" * 80 + "\n")
+    
+    def expected(record):
+        return (json.dumps(record, separators=(',', ':'), ensure_ascii=False) + "\n").encode()
+    
+    db = setup_clean_db("test_encoder")
+    
+    @table(db=db)
+    @dataclass
+    class Contact:
+        id: int = field(metadata={'primary_key': True})
+        name: str
+        balance: float = field(default=0.0)
+        active: bool = field(default=True)
+        tags: list = field(default=None)
+    
+    contacts = [
+        {"id": 1, "name": "Zoë \"Z\" O'Brien\n", "balance": 10.5, "active": True, "tags": ["a", "b"]},
+        {"id": 2, "name": "Bob", "balance": -0.0, "active": False, "tags": None},
+        {"id": 3, "name": "Carol \u2603", "balance": 1e-7, "active": True, "tags": []},
+    ]
+    # Records the encoder hands to the generic path
+    unusual = [
+        {"id": 4, "name": "Dan", "balance": float('nan'), "active": True, "tags": None},
+        {"id": 5, "name": 123, "balance": 1, "active": 1, "tags": None},
+        {"id": 6, "name": "Eve", "balance": 0.0, "active": True},
+        {"id": 7, "name": "Fay", "balance": 0.0, "active": True, "tags": None, "extra": 1},
     ]
     
-    for db_name in test_dbs:
-        db_path = Path(f"./data/{db_name}")
-        if db_path.exists():
-            shutil.rmtree(db_path)
+    # Load a second copy of the persistence module as if orjson weren't installed
+    print("✓ Saving without orjson...")
+    real_orjson = sys.modules.get("orjson")
+    sys.modules["orjson"] = None  # Makes "import orjson" raise ImportError
+    try:
+        spec = importlib.util.spec_from_file_location("persistence_stdlib", persistence.__file__)
+        stdlib_persistence = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(stdlib_persistence)
+    finally:
+        if real_orjson is None:
+            del sys.modules["orjson"]
+        else:
+            sys.modules["orjson"] = real_orjson
+    assert stdlib_persistence.orjson is None
+    
+    engine = stdlib_persistence.StorageEngine("test_encoder", str(DATA_PATH), durability="none")
+    engine.save_records("contact", contacts + unusual)
+    assert "contact" in engine._encoders, "The generated encoder should have been used"
+    engine.close()
+    
+    data_file = DATA_PATH / "test_encoder" / "data" / "contact.records"
+    lines = data_file.read_bytes().splitlines(keepends=True)
+    for record, line in zip(contacts, lines):
+        assert line == expected(record), f"{line!r} != {expected(record)!r}"
+    print(f"  {len(contacts)} schema-shaped records match json.dumps byte for byte")
+    
+    loaded = db.storage.load_records("contact")
+    assert loaded[:3] == contacts
+    assert math.isnan(loaded[3]["balance"])
+    assert loaded[4:] == unusual[1:]
+    print(f"  {len(unusual)} other records round-trip through the generic path")
+    db.close()
+    
+    print("\n✅ Test 15 passed!\n")
+
+
+def test_wal_timestamps():
+    """Test both WAL timestamp formats and rendering them."""
+    print("=" * 80)
+    print("TEST 16: WAL Timestamps")
+    print("=" * 80 + "\n")
+    
+    for wal_timestamp in ("ns", "iso"):
+        db_name = f"test_ts_{wal_timestamp}"
+        if (DATA_PATH / db_name).exists():
+            shutil.rmtree(DATA_PATH / db_name)
+        # Rendered times are truncated to microseconds, so allow a little slack
+        before = datetime.now() - timedelta(seconds=1)
+        db = Database(name=db_name, persist=True, base_path=str(DATA_PATH),
+                      durability="none", wal_timestamp=wal_timestamp)
+        
+        @table(db=db)
+        @dataclass
+        class Ping:
+            id: int = field(metadata={'primary_key': True})
+        
+        entry = db.storage.replay_wal()[0]
+        timestamp = entry['timestamp']
+        assert isinstance(timestamp, int if wal_timestamp == "ns" else str), f"{wal_timestamp}: {timestamp!r}"
+        
+        # Both formats render as ISO 8601 local time
+        rendered = persistence.format_wal_timestamp(timestamp)
+        assert before <= datetime.fromisoformat(rendered) <= datetime.now()
+        print(f"  {wal_timestamp}: {timestamp!r} -> {rendered}")
+        db.close()
+    
+    assert persistence.format_wal_timestamp(1_700_000_000_123_456_789) == \
+        datetime.fromtimestamp(1_700_000_000).replace(microsecond=123456).isoformat()
     
+    try:
+        Database(name="test_ts_bad", persist=True, base_path=str(DATA_PATH), wal_timestamp="epoch")
+        assert False, "Unknown WAL timestamp format should be rejected"
+    except ValueError as e:
+        print(f"\n✓ Correctly rejected: {e}")
+    
+    print("\n✅ Test 16 passed!\n")
+
+
+def test_length_prefixed_json():
+    """Test the json-lp record format and its framed WAL."""
+    print("=" * 80)
+    print("TEST 17: Length-Prefixed JSON")
+    print("=" * 80 + "\n")
+    
+    def open_framed():
+        return Database(name="test_json_lp", persist=True, base_path=str(DATA_PATH),
+                        durability="none", record_format="json-lp")
+    
+    db_path = DATA_PATH / "test_json_lp"
+    if db_path.exists():
+        shutil.rmtree(db_path)
+    db = open_framed()
+    
+    @table(db=db)
+    @dataclass
+    class Message:
+        id: int = field(metadata={'primary_key': True})
+        body: str
+    
+    # Newlines inside values need no escaping from the framing
+    print("✓ Saving and appending records...")
+    Message.insert_many([{"body": "hello"}, {"body": "multi\nline"}, {"body": "ünïcode"}])
+    db.save()
+    db.storage.append_records("message", [{"id": 4, "body": "appended"}])
+    db.close()
+    
+    print("✓ Loading in a new session...")
+    db_new = open_framed()
+    db_new.load()
+    bodies = [m['body'] for m in db_new.get_table("message").data]
+    assert bodies == ["hello", "multi\nline", "ünïcode", "appended"], bodies
+    assert db_new.storage.first_record("message") == {"id": 1, "body": "hello"}
+    stats = db_new.get_stats()["disk"]
+    assert stats["tables"]["message"]["records"] == 4
+    print(f"  Loaded {len(bodies)} records")
+    
+    print("\n✓ Replaying the framed WAL...")
+    wal_file = db_path / "wal" / "transaction.lp.log"
+    assert wal_file.exists() and not (db_path / "wal" / "transaction.log").exists()
+    entries = db_new.storage.replay_wal()
+    assert [e['operation'] for e in entries] == ["CREATE_TABLE", "INSERT"]
+    assert stats["wal_entries"] == 2
+    print(f"  {len(entries)} WAL entries")
+    
+    # A frame cut short by a crash is ignored, in the WAL and in data files
+    print("\n✓ Reading files with a truncated trailing frame...")
+    db_new.storage.append_records("message", [{"id": 5, "body": "cut short"}])
+    db_new.close()
+    for path in (wal_file, db_path / "data" / "message.records"):
+        path.write_bytes(path.read_bytes()[:-3])
+    
+    db_cut = open_framed()
+    db_cut.load()
+    assert [m['id'] for m in db_cut.get_table("message").data] == [1, 2, 3, 4]
+    assert len(db_cut.storage.replay_wal()) == 2
+    stats = db_cut.get_stats()["disk"]
+    assert stats["tables"]["message"]["records"] == 4
+    assert stats["wal_entries"] == 2
+    db_cut.close()
+    print("  Truncated frames skipped")
+    
+    print("\n✅ Test 17 passed!\n")
+
+
+def cleanup_test_data():
+    """Clean up all test databases."""
+    print("🗑️  Cleaning up test data...")
+    TEST_DIR.cleanup()
     print("  ✓ Cleanup complete\n")
 
 
@@ -420,6 +1024,15 @@ def main():
         test_stats()
         test_export()
         test_json_lines_format()
+        test_special_values()
+        test_durability_modes()
+        test_background_checkpoint()
+        test_msgpack_format()
+        test_columnar_layout()
+        test_incremental_replay()
+        test_generated_encoder()
+        test_wal_timestamps()
+        test_length_prefixed_json()
         
         print("=" * 80)
         print("✅ ALL PERSISTENCE TESTS PASSED!")
@@ -1,16 +1,24 @@
-from app.models import Animal, AnimalClass, Diet, ConservationStatus, AnimalStats
+from app.models import Animal, AnimalStats
+from collections import Counter
+from functools import lru_cache
 from typing import Optional
+import sys
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; search then scans in Python
+    np = None
 
 
 # Sample animal data
-ANIMALS = [
+ANIMALS = (
     Animal(
         id=1,
         name="African Elephant",
         species="Loxodonta africana",
-        animal_class=AnimalClass.MAMMAL,
+        animal_class="Mammal",
         habitat="African savannas and forests",
-        diet=Diet.HERBIVORE,
+        diet="Herbivore",
         lifespan="60-70 years",
         behavior="Social, lives in matriarchal herds",
         size="3-4 meters tall",
@@ -18,15 +26,15 @@ ANIMALS = [
         speed="40 km/h",
         color="Gray",
         interesting_fact="Elephants are the largest land animals and have excellent memory",
-        conservation_status=ConservationStatus.ENDANGERED
+        conservation_status="Endangered"
     ),
     Animal(
         id=2,
         name="Bald Eagle",
         species="Haliaeetus leucocephalus",
-        animal_class=AnimalClass.BIRD,
+        animal_class="Bird",
         habitat="Near large bodies of water in North America",
-        diet=Diet.CARNIVORE,
+        diet="Carnivore",
         lifespan="20-30 years",
         behavior="Solitary or pairs, territorial",
         size="70-102 cm length, 1.8-2.3 m wingspan",
@@ -34,15 +42,15 @@ ANIMALS = [
         speed="120-160 km/h diving",
         color="Brown body with white head and tail",
         interesting_fact="The bald eagle is the national bird of the United States",
-        conservation_status=ConservationStatus.LEAST_CONCERN
+        conservation_status="Least Concern"
     ),
     Animal(
         id=3,
         name="Bengal Tiger",
         species="Panthera tigris tigris",
-        animal_class=AnimalClass.MAMMAL,
+        animal_class="Mammal",
         habitat="Indian subcontinent forests and grasslands",
-        diet=Diet.CARNIVORE,
+        diet="Carnivore",
         lifespan="8-10 years",
         behavior="Solitary, territorial apex predator",
         size="2.7-3.1 meters long",
@@ -50,15 +58,15 @@ ANIMALS = [
         speed="49-65 km/h",
         color="Orange with black stripes",
         interesting_fact="Each tiger's stripe pattern is unique, like a fingerprint",
-        conservation_status=ConservationStatus.ENDANGERED
+        conservation_status="Endangered"
     ),
     Animal(
         id=4,
         name="Green Sea Turtle",
         species="Chelonia mydas",
-        animal_class=AnimalClass.REPTILE,
+        animal_class="Reptile",
         habitat="Tropical and subtropical oceans worldwide",
-        diet=Diet.HERBIVORE,
+        diet="Herbivore",
         lifespan="80+ years",
         behavior="Solitary, migrates long distances",
         size="1-1.2 meters long",
@@ -66,15 +74,15 @@ ANIMALS = [
         speed="35 km/h swimming",
         color="Green and brown",
         interesting_fact="Named for the green color of their fat, not their shells",
-        conservation_status=ConservationStatus.ENDANGERED
+        conservation_status="Endangered"
     ),
     Animal(
         id=5,
         name="Giant Panda",
         species="Ailuropoda melanoleuca",
-        animal_class=AnimalClass.MAMMAL,
+        animal_class="Mammal",
         habitat="Mountain forests in central China",
-        diet=Diet.HERBIVORE,
+        diet="Herbivore",
         lifespan="20 years",
         behavior="Solitary, spends 12+ hours eating bamboo",
         size="1.2-1.9 meters long",
@@ -82,15 +90,15 @@ ANIMALS = [
         speed="32 km/h",
         color="Black and white",
         interesting_fact="Pandas eat up to 38 kg of bamboo per day",
-        conservation_status=ConservationStatus.VULNERABLE
+        conservation_status="Vulnerable"
     ),
     Animal(
         id=6,
         name="Red Poison Dart Frog",
         species="Oophaga pumilio",
-        animal_class=AnimalClass.AMPHIBIAN,
+        animal_class="Amphibian",
         habitat="Rainforests of Central America",
-        diet=Diet.CARNIVORE,
+        diet="Carnivore",
         lifespan="4-6 years",
         behavior="Diurnal, territorial",
         size="17-24 mm",
@@ -98,15 +106,15 @@ ANIMALS = [
         speed=None,
         color="Bright red or orange",
         interesting_fact="Their bright colors warn predators of their toxicity",
-        conservation_status=ConservationStatus.LEAST_CONCERN
+        conservation_status="Least Concern"
     ),
     Animal(
         id=7,
         name="Great White Shark",
         species="Carcharodon carcharias",
-        animal_class=AnimalClass.FISH,
+        animal_class="Fish",
         habitat="Coastal waters worldwide",
-        diet=Diet.CARNIVORE,
+        diet="Carnivore",
         lifespan="70+ years",
         behavior="Solitary apex predator",
         size="4-6 meters long",
@@ -114,15 +122,15 @@ ANIMALS = [
         speed="56 km/h",
         color="Gray with white underside",
         interesting_fact="Can detect a single drop of blood in 100 liters of water",
-        conservation_status=ConservationStatus.VULNERABLE
+        conservation_status="Vulnerable"
     ),
     Animal(
         id=8,
         name="Emperor Penguin",
         species="Aptenodytes forsteri",
-        animal_class=AnimalClass.BIRD,
+        animal_class="Bird",
         habitat="Antarctic ice and surrounding waters",
-        diet=Diet.CARNIVORE,
+        diet="Carnivore",
         lifespan="15-20 years",
         behavior="Colonial, mates for life",
         size="100-130 cm tall",
@@ -130,15 +138,15 @@ ANIMALS = [
         speed="9 km/h swimming",
         color="Black, white, and yellow",
         interesting_fact="Males incubate eggs in harsh Antarctic winter for 64 days without eating",
-        conservation_status=ConservationStatus.LEAST_CONCERN
+        conservation_status="Least Concern"
     ),
     Animal(
         id=9,
         name="Monarch Butterfly",
         species="Danaus plexippus",
-        animal_class=AnimalClass.INVERTEBRATE,
+        animal_class="Invertebrate",
         habitat="North and Central America",
-        diet=Diet.HERBIVORE,
+        diet="Herbivore",
         lifespan="2-6 weeks (adults)",
         behavior="Migratory, travels up to 4,800 km",
         size="8.9-10.2 cm wingspan",
@@ -146,15 +154,15 @@ ANIMALS = [
         speed="40 km/h",
         color="Orange and black",
         interesting_fact="Migration generation lives 8 months, much longer than other generations",
-        conservation_status=ConservationStatus.VULNERABLE
+        conservation_status="Vulnerable"
     ),
     Animal(
         id=10,
         name="Red Kangaroo",
         species="Osphranter rufus",
-        animal_class=AnimalClass.MAMMAL,
+        animal_class="Mammal",
         habitat="Australian grasslands and deserts",
-        diet=Diet.HERBIVORE,
+        diet="Herbivore",
         lifespan="12-18 years",
         behavior="Social, lives in groups called mobs",
         size="1.3-1.6 meters tall",
@@ -162,9 +170,46 @@ ANIMALS = [
         speed="70 km/h hopping",
         color="Reddish-brown",
         interesting_fact="Can jump 3 meters high and 9 meters long in a single leap",
-        conservation_status=ConservationStatus.LEAST_CONCERN
+        conservation_status="Least Concern"
     ),
-]
+)
+
+_BY_ID: dict[int, Animal] = {a.id: a for a in ANIMALS}
+
+
+# Column views of ANIMALS, built once at import so each filter only scans
+# the fields it actually compares. Text columns are lowercased up front so
+# queries only lowercase their own argument. Class, diet, status and habitat
+# word values come from a small fixed vocabulary, so they are interned and
+# repeated values share one string object.
+_species_lower = tuple(a.species.lower() for a in ANIMALS)
+_habitat_lower = tuple(a.habitat.lower() for a in ANIMALS)
+_animal_class_lower = tuple(sys.intern(a.animal_class.lower()) for a in ANIMALS)
+_animal_class_value = tuple(sys.intern(a.animal_class) for a in ANIMALS)
+_diet_value = tuple(sys.intern(a.diet) for a in ANIMALS)
+_conservation_value = tuple(sys.intern(a.conservation_status) for a in ANIMALS)
+_first_habitat_word = tuple(sys.intern(a.habitat.split(None, 1)[0]) for a in ANIMALS)
+
+# Each animal's searchable fields in one lowercase string, so search does a
+# single substring test per animal. Fields are joined with NUL, which they
+# never contain, so queries containing NUL are rejected up front and no
+# match can straddle two fields.
+_search_text = tuple(
+    "\0".join((a.name, a.species, a.interesting_fact)).lower() for a in ANIMALS
+)
+
+# Collection size from which search matches whole NumPy string arrays at
+# once instead of looping in Python
+_VECTORIZE_MIN_ROWS = 32
+
+_search_array = None
+if np is not None and len(ANIMALS) >= _VECTORIZE_MIN_ROWS:
+    _search_array = np.array(_search_text, dtype=np.str_)
+
+# Row indices per lowercased class, so the equality filter is a single probe
+_BY_CLASS: dict[str, tuple[int, ...]] = {}
+for _i, _class_lower in enumerate(_animal_class_lower):
+    _BY_CLASS[_class_lower] = _BY_CLASS.get(_class_lower, ()) + (_i,)
 
 
 def get_all_animals(
@@ -173,70 +218,76 @@ def get_all_animals(
     species: Optional[str] = None
 ) -> list[Animal]:
     """Get all animals with optional filters"""
-    filtered = ANIMALS
+    if not (animal_class or habitat or species):
+        return list(ANIMALS)
+
+    # The cached result is a tuple; hand callers their own list
+    return list(_filter_animals(
+        animal_class.lower() if animal_class else None,
+        habitat.lower() if habitat else None,
+        species.lower() if species else None
+    ))
 
-    if animal_class:
-        filtered = [a for a in filtered if a.animal_class.value.lower() == animal_class.lower()]
 
-    if habitat:
-        filtered = [a for a in filtered if habitat.lower() in a.habitat.lower()]
+@lru_cache(maxsize=256)
+def _filter_animals(
+    class_lower: Optional[str],
+    habitat_lower: Optional[str],
+    species_lower: Optional[str]
+) -> tuple[Animal, ...]:
+    # Probe the class index first; the substring filters then only scan
+    # the candidates it leaves
+    if class_lower:
+        indices = _BY_CLASS.get(class_lower, ())
+    else:
+        indices = range(len(ANIMALS))
 
-    if species:
-        filtered = [a for a in filtered if species.lower() in a.species.lower()]
+    if habitat_lower:
+        indices = [i for i in indices if habitat_lower in _habitat_lower[i]]
 
-    return filtered
+    if species_lower:
+        indices = [i for i in indices if species_lower in _species_lower[i]]
+
+    return tuple(ANIMALS[i] for i in indices)
 
 
 def get_animal_by_id(animal_id: int) -> Optional[Animal]:
     """Get a single animal by ID"""
-    for animal in ANIMALS:
-        if animal.id == animal_id:
-            return animal
-    return None
+    return _BY_ID.get(animal_id)
 
 
 def search_animals(query: str) -> list[Animal]:
     """Search animals by name, species, or interesting facts"""
-    query_lower = query.lower()
-    results = []
+    return list(_search_animals(query.lower()))
 
-    for animal in ANIMALS:
-        if (query_lower in animal.name.lower() or
-            query_lower in animal.species.lower() or
-            query_lower in animal.interesting_fact.lower()):
-            results.append(animal)
 
-    return results
+@lru_cache(maxsize=256)
+def _search_animals(query_lower: str) -> tuple[Animal, ...]:
+    if "\0" in query_lower:
+        return ()
 
+    if _search_array is not None:
+        mask = np.char.find(_search_array, query_lower) >= 0
+        return tuple(ANIMALS[i] for i in np.flatnonzero(mask).tolist())
 
-def get_stats() -> AnimalStats:
-    """Calculate statistics about the animal collection"""
-    by_class = {}
-    by_diet = {}
-    by_habitat = {}
-    by_conservation = {}
-
-    for animal in ANIMALS:
-        # Count by class
-        class_name = animal.animal_class.value
-        by_class[class_name] = by_class.get(class_name, 0) + 1
-
-        # Count by diet
-        diet_name = animal.diet.value
-        by_diet[diet_name] = by_diet.get(diet_name, 0) + 1
+    return tuple(ANIMALS[i] for i, text in enumerate(_search_text) if query_lower in text)
 
-        # Count by habitat (simplified - just use first word)
-        habitat_key = animal.habitat.split()[0]
-        by_habitat[habitat_key] = by_habitat.get(habitat_key, 0) + 1
-
-        # Count by conservation status
-        status_name = animal.conservation_status.value
-        by_conservation[status_name] = by_conservation.get(status_name, 0) + 1
 
+def _compute_stats() -> AnimalStats:
+    # Habitat is simplified to its first word
     return AnimalStats(
         total_animals=len(ANIMALS),
-        by_class=by_class,
-        by_diet=by_diet,
-        by_habitat=by_habitat,
-        by_conservation_status=by_conservation
+        by_class=dict(Counter(_animal_class_value)),
+        by_diet=dict(Counter(_diet_value)),
+        by_habitat=dict(Counter(_first_habitat_word)),
+        by_conservation_status=dict(Counter(_conservation_value))
     )
+
+
+# ANIMALS never changes at runtime, so the stats are computed once
+_STATS = _compute_stats()
+
+
+def get_stats() -> AnimalStats:
+    """Calculate statistics about the animal collection"""
+    return _STATS
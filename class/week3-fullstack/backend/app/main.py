@@ -1,43 +1,61 @@
-from fastapi import FastAPI
+import json
+import os
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from app.routers import animals, stats
 
 
+# Interactive docs and the OpenAPI schema are on by default for development
+# and type generation; set ENABLE_DOCS=0 in production to skip them
+DOCS_ENABLED = os.getenv("ENABLE_DOCS", "1") != "0"
+
 app = FastAPI(
     title="Animal Explorer API",
     description="A RESTful API for exploring the animal kingdom",
-    version="1.0.0"
+    version="1.0.0",
+    openapi_url="/openapi.json" if DOCS_ENABLED else None,
+    docs_url="/docs" if DOCS_ENABLED else None,
+    redoc_url="/redoc" if DOCS_ENABLED else None
 )
 
-# Configure CORS
+# Configure CORS (a frozenset, so each origin check is a hash lookup)
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=[
+    allow_origins=frozenset({
         "http://localhost:5173",  # Vite default
         "http://localhost:3000",  # Create React App default
         "http://localhost:5174",  # Vite alternate
-    ],
+    }),
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
 )
 
+# Compress larger bodies such as the animal list; tiny ones aren't worth it
+app.add_middleware(GZipMiddleware, minimum_size=500, compresslevel=5)
+
 # Include routers
 app.include_router(animals.router)
 app.include_router(stats.router)
 
+# Bodies of the constant endpoints, serialized once
+_ROOT_BODY = json.dumps({
+    "message": "Welcome to Animal Explorer API",
+    "version": "1.0.0",
+    "docs": "/docs" if DOCS_ENABLED else None
+}, separators=(",", ":")).encode()
+_HEALTH_BODY = json.dumps({"status": "healthy"}, separators=(",", ":")).encode()
+
 
 @app.get("/")
 async def root():
     """Root endpoint with API information"""
-    return {
-        "message": "Welcome to Animal Explorer API",
-        "version": "1.0.0",
-        "docs": "/docs"
-    }
+    return Response(content=_ROOT_BODY, media_type="application/json")
 
 
 @app.get("/health")
+@app.head("/health")
 async def health_check():
     """Health check endpoint"""
-    return {"status": "healthy"}
+    return Response(content=_HEALTH_BODY, media_type="application/json")
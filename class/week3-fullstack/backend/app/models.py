@@ -1,35 +1,41 @@
-from enum import Enum
-from pydantic import BaseModel, Field
-from typing import Optional
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Annotated, Literal, Optional
+from typing_extensions import TypeAliasType
 
 
-class AnimalClass(str, Enum):
-    """Classification of animals by their biological class"""
-    MAMMAL = "Mammal"
-    BIRD = "Bird"
-    REPTILE = "Reptile"
-    AMPHIBIAN = "Amphibian"
-    FISH = "Fish"
-    INVERTEBRATE = "Invertebrate"
+# Categories are Literal unions of plain strings rather than str Enums, so
+# pydantic-core validates them with a set lookup and stores plain str values.
+# Named aliases keep them as their own OpenAPI schemas.
+AnimalClass = TypeAliasType(
+    "AnimalClass",
+    Annotated[
+        Literal["Mammal", "Bird", "Reptile", "Amphibian", "Fish", "Invertebrate"],
+        Field(title="AnimalClass", description="Classification of animals by their biological class"),
+    ],
+)
 
+Diet = TypeAliasType(
+    "Diet",
+    Annotated[
+        Literal["Carnivore", "Herbivore", "Omnivore"],
+        Field(title="Diet", description="Dietary classification"),
+    ],
+)
 
-class Diet(str, Enum):
-    """Dietary classification"""
-    CARNIVORE = "Carnivore"
-    HERBIVORE = "Herbivore"
-    OMNIVORE = "Omnivore"
-
-
-class ConservationStatus(str, Enum):
-    """IUCN Conservation Status"""
-    LEAST_CONCERN = "Least Concern"
-    VULNERABLE = "Vulnerable"
-    ENDANGERED = "Endangered"
-    CRITICALLY_ENDANGERED = "Critically Endangered"
+ConservationStatus = TypeAliasType(
+    "ConservationStatus",
+    Annotated[
+        Literal["Least Concern", "Vulnerable", "Endangered", "Critically Endangered"],
+        Field(title="ConservationStatus", description="IUCN Conservation Status"),
+    ],
+)
 
 
 class Animal(BaseModel):
     """Complete animal data model"""
+    # The fixtures in app.data are shared read-only across requests
+    model_config = ConfigDict(frozen=True)
+
     # Basic Information
     id: int
     name: str
@@ -1,13 +1,35 @@
-from fastapi import APIRouter, HTTPException, Query
-from typing import Optional
+from fastapi import APIRouter, Query, Response
+from typing import Iterable, Optional
 from app.models import Animal
-from app.data import get_all_animals, get_animal_by_id, search_animals
+from app.data import ANIMALS, get_all_animals, get_animal_by_id, search_animals
 
 
 router = APIRouter(prefix="/api/animals", tags=["animals"])
 
+# The animals never change, so each one is serialized to JSON once and
+# responses just join the cached bytes. Routes declare their schema through
+# `responses` rather than response_model, so FastAPI builds no response
+# validator for them. The OpenAPI schemas are the same; only the generated
+# titles of the list responses gain a "200" ("Response 200 List Animals ...").
+_ANIMAL_JSON: dict[int, bytes] = {a.id: a.model_dump_json().encode() for a in ANIMALS}
 
-@router.get("", response_model=list[Animal])
+
+def _animal_list_body(animals: Iterable[Animal]) -> bytes:
+    return b"[" + b",".join([_ANIMAL_JSON[a.id] for a in animals]) + b"]"
+
+
+# Body of the unfiltered list, the most common request
+_ALL_ANIMALS_BODY = _animal_list_body(ANIMALS)
+
+# Same body FastAPI's HTTPException handler would send for a 404
+_NOT_FOUND_BODY = b'{"detail":"Animal not found"}'
+
+
+def _json_response(body: bytes) -> Response:
+    return Response(content=body, media_type="application/json")
+
+
+@router.get("", responses={200: {"model": list[Animal]}})
 async def list_animals(
     animal_class: Optional[str] = Query(None, description="Filter by animal class"),
     habitat: Optional[str] = Query(None, description="Filter by habitat keyword"),
@@ -20,10 +42,14 @@ async def list_animals(
     - **habitat**: Filter by habitat keyword
     - **species**: Filter by species name
     """
-    return get_all_animals(animal_class=animal_class, habitat=habitat, species=species)
+    if not (animal_class or habitat or species):
+        return _json_response(_ALL_ANIMALS_BODY)
+
+    animals = get_all_animals(animal_class=animal_class, habitat=habitat, species=species)
+    return _json_response(_animal_list_body(animals))
 
 
-@router.get("/search", response_model=list[Animal])
+@router.get("/search", responses={200: {"model": list[Animal]}})
 async def search(q: str = Query(..., description="Search query")):
     """
     Search animals by name, species, or interesting facts
@@ -31,10 +57,10 @@ async def search(q: str = Query(..., description="Search query")):
     - **q**: Search query string
     """
     results = search_animals(q)
-    return results
+    return _json_response(_animal_list_body(results))
 
 
-@router.get("/{animal_id}", response_model=Animal)
+@router.get("/{animal_id}", responses={200: {"model": Animal}})
 async def get_animal(animal_id: int):
     """
     Get a single animal by ID
@@ -42,6 +68,6 @@ async def get_animal(animal_id: int):
     - **animal_id**: Unique animal identifier
     """
     animal = get_animal_by_id(animal_id)
-    if not animal:
-        raise HTTPException(status_code=404, detail="Animal not found")
-    return animal
+    if animal is None:
+        return Response(content=_NOT_FOUND_BODY, status_code=404, media_type="application/json")
+    return _json_response(_ANIMAL_JSON[animal.id])
@@ -1,12 +1,17 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Response
 from app.models import AnimalStats
 from app.data import get_stats
 
 
 router = APIRouter(prefix="/api/stats", tags=["statistics"])
 
+# The stats never change, so the response body is serialized once. As in the
+# animals router, the schema is declared through `responses` so FastAPI builds
+# no response validator for the route.
+_STATS_BODY = get_stats().model_dump_json().encode()
 
-@router.get("", response_model=AnimalStats)
+
+@router.get("", responses={200: {"model": AnimalStats}})
 async def get_statistics():
     """
     Get statistics about the animal collection
@@ -17,4 +22,4 @@ async def get_statistics():
     - Habitat
     - Conservation status
     """
-    return get_stats()
+    return Response(content=_STATS_BODY, media_type="application/json")
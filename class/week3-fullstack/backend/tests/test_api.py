@@ -6,6 +6,13 @@ from app.main import app
 client = TestClient(app)
 
 
+@pytest.fixture(scope="module", autouse=True)
+def running_client():
+    """Run the app's lifespan once and reuse one event loop thread for all requests"""
+    with client:
+        yield client
+
+
 def test_root_endpoint():
     """Test root endpoint returns welcome message"""
     response = client.get("/")
@@ -22,6 +29,13 @@ def test_health_check():
     assert response.json() == {"status": "healthy"}
 
 
+def test_health_check_head():
+    """Test health check answers HEAD without a body"""
+    response = client.head("/health")
+    assert response.status_code == 200
+    assert response.content == b""
+
+
 def test_list_all_animals():
     """Test listing all animals"""
     response = client.get("/api/animals")
@@ -31,6 +45,16 @@ def test_list_all_animals():
     assert animals[0]["name"] == "African Elephant"
 
 
+def test_list_animals_gzip():
+    """Test that the animal list is gzip-compressed and small bodies are not"""
+    response = client.get("/api/animals", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert len(response.json()) == 10
+
+    response = client.get("/health", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+
+
 def test_filter_by_class():
     """Test filtering animals by class"""
     response = client.get("/api/animals?animal_class=Mammal")
@@ -121,3 +145,14 @@ def test_stats_structure():
     # Verify conservation statuses
     assert "Least Concern" in stats["by_conservation_status"]
     assert "Endangered" in stats["by_conservation_status"]
+
+
+def test_cors_preflight():
+    """Test CORS preflight for allowed and unknown origins"""
+    headers = {"Access-Control-Request-Method": "GET"}
+    response = client.options("/api/animals", headers={**headers, "Origin": "http://localhost:5173"})
+    assert response.status_code == 200
+    assert response.headers["access-control-allow-origin"] == "http://localhost:5173"
+
+    response = client.options("/api/animals", headers={**headers, "Origin": "http://example.com"})
+    assert response.status_code == 400
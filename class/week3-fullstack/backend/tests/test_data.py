@@ -0,0 +1,35 @@
+import pytest
+from app import data
+from app.data import ANIMALS, search_animals
+
+
+def _queries():
+    """Queries covering whole fields, fragments and the field separator"""
+    queries = ["", "a", "the", "PANTHERA", "zzz", "\0"]
+    for animal in ANIMALS:
+        queries.append(animal.name)
+        queries.append(animal.species[:4])
+        # Straddles the NUL between name and species; matches neither path
+        queries.append(animal.name[-2:] + animal.species[:2])
+        queries.append(animal.name[-2:] + "\0" + animal.species[:2])
+    return queries
+
+
+def test_search_numpy_path_matches_python(monkeypatch):
+    """Test the NumPy string array search returns what the Python scan does"""
+    np = pytest.importorskip("numpy")
+    queries = _queries()
+
+    monkeypatch.setattr(data, "_search_array", None)
+    data._search_animals.cache_clear()
+    expected = [search_animals(query) for query in queries]
+
+    monkeypatch.setattr(data, "_search_array", np.array(data._search_text, dtype=np.str_))
+    data._search_animals.cache_clear()
+    try:
+        assert [search_animals(query) for query in queries] == expected
+    finally:
+        data._search_animals.cache_clear()
+
+    assert any(expected), "Some queries should match"
+    assert search_animals("\0") == []
@@ -1,5 +1,4 @@
 import pytest
-from pydantic import ValidationError
 from app.models import Animal, AnimalClass, Diet, ConservationStatus
 
 
@@ -9,9 +8,9 @@ def test_valid_animal():
         id=1,
         name="Test Animal",
         species="Testus animalus",
-        animal_class=AnimalClass.MAMMAL,
+        animal_class="Mammal",
         habitat="Test habitat",
-        diet=Diet.HERBIVORE,
+        diet="Herbivore",
         lifespan="10 years",
         behavior="Friendly",
         size="1 meter",
@@ -19,12 +18,12 @@ def test_valid_animal():
         speed="30 km/h",
         color="Brown",
         interesting_fact="This is a test animal",
-        conservation_status=ConservationStatus.LEAST_CONCERN
+        conservation_status="Least Concern"
     )
 
     assert animal.id == 1
     assert animal.name == "Test Animal"
-    assert animal.animal_class == AnimalClass.MAMMAL
+    assert animal.animal_class == "Mammal"
 
 
 def test_animal_without_optional_speed():
@@ -33,23 +32,50 @@ def test_animal_without_optional_speed():
         id=2,
         name="Slow Animal",
         species="Slowus creature",
-        animal_class=AnimalClass.REPTILE,
+        animal_class="Reptile",
         habitat="Swamp",
-        diet=Diet.CARNIVORE,
+        diet="Carnivore",
         lifespan="20 years",
         behavior="Sluggish",
         size="2 meters",
         weight="100 kg",
         color="Green",
         interesting_fact="Very slow",
-        conservation_status=ConservationStatus.VULNERABLE
+        conservation_status="Vulnerable"
     )
 
     assert animal.speed is None
 
 
+def test_animal_is_immutable():
+    """Test that animals are frozen and hashable"""
+    from pydantic import ValidationError
+
+    animal = Animal(
+        id=5,
+        name="Steady Animal",
+        species="Steadius fixus",
+        animal_class="Fish",
+        habitat="Reef",
+        diet="Carnivore",
+        lifespan="8 years",
+        behavior="Calm",
+        size="30 cm",
+        weight="1 kg",
+        color="Blue",
+        interesting_fact="Never changes",
+        conservation_status="Least Concern"
+    )
+
+    with pytest.raises(ValidationError):
+        animal.name = "Changed"
+    assert hash(animal) == hash(animal.model_copy())
+
+
 def test_invalid_animal_class():
     """Test that invalid animal class raises validation error"""
+    from pydantic import ValidationError
+
     with pytest.raises(ValidationError):
         Animal(
             id=3,
@@ -57,31 +83,35 @@ def test_invalid_animal_class():
             species="Invalid species",
             animal_class="InvalidClass",  # Invalid enum value
             habitat="Nowhere",
-            diet=Diet.OMNIVORE,
+            diet="Omnivore",
             lifespan="5 years",
             behavior="Confused",
             size="1 meter",
             weight="20 kg",
             color="Gray",
             interesting_fact="Doesn't exist",
-            conservation_status=ConservationStatus.LEAST_CONCERN
+            conservation_status="Least Concern"
         )
 
 
 def test_missing_required_field():
     """Test that missing required field raises validation error"""
+    from pydantic import ValidationError
+
     with pytest.raises(ValidationError):
         Animal(
             id=4,
             name="Incomplete Animal",
             # Missing species and other required fields
-            animal_class=AnimalClass.BIRD,
+            animal_class="Bird",
             habitat="Sky"
         )
 
 
-def test_enum_values():
-    """Test that enum values are correct"""
-    assert AnimalClass.MAMMAL.value == "Mammal"
-    assert Diet.CARNIVORE.value == "Carnivore"
-    assert ConservationStatus.ENDANGERED.value == "Endangered"
+def test_category_values():
+    """Test that category values validate as plain strings"""
+    from pydantic import TypeAdapter
+
+    assert TypeAdapter(AnimalClass).validate_python("Mammal") == "Mammal"
+    assert TypeAdapter(Diet).validate_python("Carnivore") == "Carnivore"
+    assert TypeAdapter(ConservationStatus).validate_python("Endangered") == "Endangered"